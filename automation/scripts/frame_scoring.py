@@ -0,0 +1,26 @@
+"""
+Frame scoring shared by the watermark remover's best-frame picker and
+create_poster.py: which of several decoded frames makes the best still.
+"""
+
+import numpy as np
+
+
+def score_frames(frames, bgr=False):
+    """Sharpness x exposure score per HxWx3 RGB (or OpenCV BGR) frame, higher is better
+
+    Sharpness is the variance of a 4-neighbour Laplacian on quarter-resolution
+    luma - motion blur and cross-fades flatten it. Exposure favours a mid-grey
+    mean and penalises clipped shadows/highlights, which sinks fades to black.
+    """
+    weights = [0.114, 0.587, 0.299] if bgr else [0.299, 0.587, 0.114]
+    luma = np.stack([frame[::4, ::4, :3] for frame in frames]).astype(np.float32) \
+        @ np.array(weights, np.float32)
+
+    laplacian = (4 * luma[:, 1:-1, 1:-1] - luma[:, :-2, 1:-1] - luma[:, 2:, 1:-1]
+                 - luma[:, 1:-1, :-2] - luma[:, 1:-1, 2:])
+    sharpness = np.log1p(laplacian.var(axis=(1, 2)))
+    mean = luma.mean(axis=(1, 2)) / 255
+    clipped = ((luma < 8) | (luma > 247)).mean(axis=(1, 2))
+    exposure = (1 - np.abs(mean - 0.5)) * (1 - clipped)
+    return sharpness * exposure
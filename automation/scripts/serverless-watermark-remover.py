@@ -1,67 +1,1936 @@
 """
 Serverless Watermark Remover
-Deploy to Vercel/AWS Lambda/Cloudflare Workers
+Deploy to Vercel/AWS Lambda/Cloudflare Workers, or run on a box with gunicorn:
+
+    gunicorn -c automation/scripts/watermark-gunicorn.conf.py
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
 import base64
+import hashlib
+import importlib.util
+import io
+import json
+import math
 import os
+import queue
+import re
+import sqlite3
 import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import product
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import numpy as np
+except ImportError:  # best-frame selection needs NumPy; without it we take the fixed frame
+    np = None
+
+try:
+    import av
+except ImportError:  # the in-process decoder needs PyAV; ffmpeg subprocesses still work
+    av = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow encodes for the in-process decoder and builds multi-frame output
+    Image = None
 
 app = Flask(__name__)
 
-@app.route('/api/remove-watermark', methods=['POST'])
-def remove_watermark():
-    data = request.get_json()
-    video_url = data.get('video_url')
+# Download limits - override with environment variables
+MAX_VIDEO_BYTES = int(os.environ.get('WATERMARK_MAX_VIDEO_MB', '200')) * 1024 * 1024
+CONNECT_TIMEOUT = float(os.environ.get('WATERMARK_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.environ.get('WATERMARK_READ_TIMEOUT', '30'))
+DOWNLOAD_DEADLINE = float(os.environ.get('WATERMARK_DOWNLOAD_DEADLINE', '120'))
+CHUNK_SIZE = 256 * 1024
+
+# Keep-alive pool shared by every request thread: up to POOL_PER_HOST idle
+# connections kept per video host (extra requests open a one-off connection
+# rather than wait, since requests can't bound that wait), HTTP_RETRIES
+# retries with backoff on connection errors and 429/5xx
+POOL_HOSTS = 16
+POOL_PER_HOST = int(os.environ.get('WATERMARK_POOL_PER_HOST', '8'))
+HTTP_RETRIES = int(os.environ.get('WATERMARK_HTTP_RETRIES', '3'))
+
+# How ffmpeg gets the video: 'url' lets ffmpeg open the URL itself and seek
+# with HTTP range reads; 'download' streams the whole file to disk first
+INPUT_MODE = os.environ.get('WATERMARK_INPUT_MODE', 'url')
+INPUT_MODES = ('url', 'download')
+FRAME_TIME = float(os.environ.get('WATERMARK_FRAME_TIME', '2'))
+
+# Best-frame selection: decode FRAME_CANDIDATES frames spread over a
+# FRAME_WINDOW-second window centred on FRAME_TIME and keep the sharpest,
+# best-exposed one (1 = the fixed frame at FRAME_TIME). Selection should add
+# no more than FRAME_SELECT_BUDGET_MS over the fixed frame - checked by
+# watermark-benchmark.py
+FRAME_CANDIDATES = int(os.environ.get('WATERMARK_FRAME_CANDIDATES', '8')) if np is not None else 1
+FRAME_WINDOW = float(os.environ.get('WATERMARK_FRAME_WINDOW', '1'))
+FRAME_SELECT_BUDGET_MS = float(os.environ.get('WATERMARK_FRAME_BUDGET_MS', '250'))
+
+# Decode backend: 'pyav' decodes in-process (PyAV, NumPy crop, Pillow encode),
+# 'ffmpeg' runs an ffmpeg subprocess per frame, 'auto' takes pyav when it's
+# installed. Any in-process failure falls back to the subprocess.
+DECODE_BACKEND = os.environ.get('WATERMARK_DECODE_BACKEND', 'auto')
+IN_PROCESS_DECODE = av is not None and np is not None and Image is not None
+ACTIVE_DECODE_BACKEND = 'pyav' if IN_PROCESS_DECODE and DECODE_BACKEND in ('auto', 'pyav') else 'ffmpeg'
+if DECODE_BACKEND == 'pyav' and not IN_PROCESS_DECODE:
+    print("⚠️  WATERMARK_DECODE_BACKEND=pyav needs PyAV, Pillow and NumPy - using ffmpeg")
+RANGE_BLOCK_SIZE = 512 * 1024  # HTTP range read size for in-process decoding
+FFMPEG_TIMEOUT = float(os.environ.get('WATERMARK_FFMPEG_TIMEOUT', '60'))
+
+# At most FFMPEG_CONCURRENCY ffmpeg processes at once; callers queue for a slot
+# up to FFMPEG_QUEUE_TIMEOUT seconds before the request is turned away (503)
+FFMPEG_CONCURRENCY = int(os.environ.get('WATERMARK_FFMPEG_CONCURRENCY', str(os.cpu_count() or 2)))
+FFMPEG_QUEUE_TIMEOUT = float(os.environ.get('WATERMARK_FFMPEG_QUEUE_TIMEOUT', '10'))
+RETRY_AFTER = int(os.environ.get('WATERMARK_RETRY_AFTER', '5'))
+
+# Multi-frame output: up to MAX_FRAMES timestamps per request, at least
+# MIN_FRAME_SPACING seconds apart, returned as separate images or one sprite
+# sheet. Every frame is held in memory until the response is built.
+MAX_FRAMES = int(os.environ.get('WATERMARK_MAX_FRAMES', '30'))
+MIN_FRAME_SPACING = 0.1
+FRAME_SEEK_GAP = 3.0  # seek, rather than read through, gaps between timestamps longer than this
+LAYOUTS = ('frames', 'sprite')
+SPRITE_COLUMNS = 5
+SPRITE_TILE_WIDTH = 320
+
+# Watermark strip removed from the bottom of the frame
+CROP_BOTTOM = int(os.environ.get('WATERMARK_CROP_BOTTOM', '80'))
+JPEG_QUALITY = 2  # ffmpeg -q:v scale, 2 (best) .. 31
+WEBP_QUALITY = int(os.environ.get('WATERMARK_WEBP_QUALITY', '85'))
+
+# 'fixed' always chops CROP_BOTTOM px. 'auto' finds static overlays (logos,
+# usernames, captions) by comparing frames sampled across the video and crops
+# the smallest border strips that remove them. Once CROP_PROFILE_VOTES videos
+# from one host at one resolution agree on a crop, it's remembered in
+# CROP_PROFILES for CROP_PROFILE_DAYS and later videos skip detection. Opt-in
+# (per request or via WATERMARK_CROP_MODE); needs PyAV and NumPy and falls
+# back to 'fixed' without them, or whenever detection finds nothing certain.
+AUTO_CROP = av is not None and np is not None
+CROP_MODES = ('auto', 'fixed')
+CROP_MODE = os.environ.get('WATERMARK_CROP_MODE', 'fixed')
+if CROP_MODE == 'auto' and not AUTO_CROP:
+    print("⚠️  WATERMARK_CROP_MODE=auto needs PyAV and NumPy - using the fixed crop")
+CROP_PROFILES = os.environ.get('WATERMARK_CROP_PROFILES',
+                               os.path.join(tempfile.gettempdir(), 'watermark-crop-profiles.json'))
+CROP_PROFILE_VOTES = int(os.environ.get('WATERMARK_CROP_PROFILE_VOTES', '2'))
+CROP_PROFILE_TTL = float(os.environ.get('WATERMARK_CROP_PROFILE_DAYS', '7')) * 86400
+DETECT_SAMPLES = 6       # frames compared, spread over the first DETECT_SPAN seconds
+DETECT_SPAN = 30.0
+DETECT_STILL_STD = 6.0   # luma std dev (0-255) below which a pixel counts as static
+DETECT_EDGE = 24.0       # luma step that marks overlay detail on the averaged frame
+DETECT_BAND = 0.25       # overlays are looked for this far in from the top and bottom
+DETECT_MAX_REGIONS = 6
+DETECT_MAX_CROP = 0.35   # a bigger crop than this means a static video, not an overlay
+
+# ffmpeg output options and MIME type per image format
+IMAGE_FORMATS = {
+    'jpeg': (['-f', 'image2pipe', '-c:v', 'mjpeg', '-q:v', str(JPEG_QUALITY)], 'image/jpeg'),
+    'webp': (['-f', 'webp', '-c:v', 'libwebp', '-quality', str(WEBP_QUALITY)], 'image/webp'),
+}
+
+# Pillow save options per image format, for the in-process backend (quality
+# picked to land at about the same size as ffmpeg's -q:v 2)
+PIL_FORMATS = {
+    'jpeg': ('JPEG', {'quality': 92}),
+    'webp': ('WEBP', {'quality': WEBP_QUALITY}),
+}
+
+# Response formats: JSON with a base64 data URI (the original API) or raw image bytes
+RESPONSE_FORMATS = {'json': 'application/json', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+IMAGE_CACHE_CONTROL = 'public, max-age=86400'
+
+# Batch endpoint limits
+BATCH_WORKERS = int(os.environ.get('WATERMARK_BATCH_WORKERS', '4'))
+BATCH_MAX_ITEMS = int(os.environ.get('WATERMARK_BATCH_MAX_ITEMS', '100'))
+
+# Async jobs: worker threads per process; set WATERMARK_JOB_DB to a file path
+# to keep jobs in SQLite (survives restarts, visible to every worker process)
+JOB_WORKERS = int(os.environ.get('WATERMARK_JOB_WORKERS', '2'))
+JOB_MAX_QUEUED = int(os.environ.get('WATERMARK_JOB_MAX_QUEUED', '1000'))
+JOB_TTL = float(os.environ.get('WATERMARK_JOB_TTL', '3600'))
+JOB_DB = os.environ.get('WATERMARK_JOB_DB', '')
+# A running job belongs to its process for JOB_LEASE seconds at a time, renewed
+# while it runs; only jobs whose lease ran out or whose process died are retried
+JOB_LEASE = float(os.environ.get('WATERMARK_JOB_LEASE', '60'))
+JOB_POLL_INTERVAL = 2.0  # idle workers look for jobs queued by other processes this often
+
+# Result cache on local disk - WATERMARK_CACHE_MB=0 turns it off
+CACHE_DIR = os.environ.get('WATERMARK_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'watermark-cache'))
+CACHE_MAX_BYTES = int(os.environ.get('WATERMARK_CACHE_MB', '512')) * 1024 * 1024
+CACHE_TTL = float(os.environ.get('WATERMARK_CACHE_TTL', str(24 * 3600)))
+
+# Scratch space for downloaded videos: a RAM-backed directory when one can hold
+# the whole budget, else the system temp dir. WATERMARK_SCRATCH_MB is per
+# process and caps the bytes on disk at once; a download waits for room like
+# it waits for an ffmpeg slot. Downloads without a Content-Length reserve
+# SCRATCH_STEP_MB at a time as they grow rather than the full size limit.
+SCRATCH_DIR = os.environ.get('WATERMARK_SCRATCH_DIR', '')
+SCRATCH_MAX_BYTES = int(os.environ.get('WATERMARK_SCRATCH_MB', '1024')) * 1024 * 1024
+SCRATCH_STEP = int(os.environ.get('WATERMARK_SCRATCH_STEP_MB', '16')) * 1024 * 1024
+SCRATCH_STALE_AFTER = 3600  # seconds; nothing legitimately lives this long
+RAM_DIRS = ('/dev/shm',)
+
+# Query parameters that only sign or expire a URL (Supabase, S3, Azure,
+# CloudFront) and don't change which video it points at
+VOLATILE_PARAMS = set(
+    os.environ.get(
+        'WATERMARK_CACHE_IGNORE_PARAMS',
+        'token,sig,se,st,sp,sv,sr,skoid,sktid,skt,ske,sks,skv,'
+        'x-amz-signature,x-amz-date,x-amz-expires,x-amz-credential,x-amz-security-token,'
+        'x-amz-signedheaders,x-amz-algorithm,expires,signature,key-pair-id,policy'
+    ).lower().split(',')
+)
+
+
+class VideoTooLarge(Exception):
+    pass
+
+
+class FFmpegError(Exception):
+    pass
+
+
+class SourceError(FFmpegError):
+    """The video couldn't be opened or read where it is (no range support, HTTP or
+    protocol errors); unlike a failed decode, a downloaded copy may still work"""
+
+
+# ffmpeg stderr that means the input never opened or stopped being readable
+SOURCE_ERRORS = re.compile(
+    r'Error opening input|Server returned|HTTP error|Connection (?:refused|reset|timed out)'
+    r'|Input/output error|Protocol not found|Failed to resolve|Network is unreachable'
+)
+
+
+class ServerBusy(Exception):
+    """No ffmpeg slot freed up within the queue deadline"""
+
+
+class ConcurrencyLimiter:
+    """Semaphore capping concurrent ffmpeg runs, with queue depth and wait stats"""
+
+    def __init__(self, limit, sample_size=1000):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=sample_size)
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+
+    def acquire(self, timeout):
+        """Wait for a slot (forever when timeout is None); raise ServerBusy on deadline"""
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            ok = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            if not ok:
+                self.rejected += 1
+                raise ServerBusy(f'all {self.limit} ffmpeg slots busy for {timeout:.0f}s, retry later')
+            self.active += 1
+            self.acquired += 1
+            self._waits.append(time.monotonic() - started)
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                'limit': self.limit,
+                'active': self.active,
+                'waiting': self.waiting,
+                'peak_waiting': self.peak_waiting,
+                'acquired': self.acquired,
+                'rejected': self.rejected,
+            }
+        if waits:
+            stats['wait_ms'] = {
+                'p50': round(waits[len(waits) // 2] * 1000, 1),
+                'p99': round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 1),
+                'max': round(waits[-1] * 1000, 1),
+            }
+        return stats
+
+
+ffmpeg_limiter = ConcurrencyLimiter(FFMPEG_CONCURRENCY)
+
+
+def process_alive(pid):
+    """Whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # someone else's process
+    return True
+
+
+class ScratchSpace:
+    """Per-request scratch files in one directory, kept within a byte budget
+
+    Files are named after the owning process, removed when their `with`
+    block exits however it exits, and removed at interpreter exit if a
+    thread was still using one. Whatever a killed worker left behind is
+    swept when the next process starts.
+    """
+
+    def __init__(self, directory, max_bytes, stale_after=SCRATCH_STALE_AFTER):
+        self.root = os.path.abspath(directory or self.pick_root(max_bytes))
+        self.directory = os.path.join(self.root, 'watermark-scratch')
+        self.ram_backed = any(os.path.commonpath([self.root, ram]) == ram for ram in RAM_DIRS)
+        self.max_bytes = max_bytes
+        self.stale_after = stale_after
+        self.used = 0
+        self.peak = 0
+        self.files = 0
+        self.rejected = 0
+        self.swept = 0
+        self._open = set()
+        self._space = threading.Condition()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def pick_root(max_bytes):
+        """The first RAM-backed directory with room for the whole budget, else the temp dir"""
+        for ram in RAM_DIRS:
+            try:
+                stat = os.statvfs(ram)
+            except OSError:
+                continue
+            if os.access(ram, os.W_OK) and stat.f_bavail * stat.f_frsize >= max_bytes:
+                return ram
+        return tempfile.gettempdir()
+
+    def sweep(self):
+        """Remove files whose process is gone, and anything older than stale_after"""
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            pid = entry.name.split('-', 1)[0]
+            try:
+                if pid.isdigit() and int(pid) != os.getpid() and not process_alive(int(pid)):
+                    os.unlink(entry.path)
+                elif now - entry.stat().st_mtime > self.stale_after:
+                    os.unlink(entry.path)
+                else:
+                    continue
+            except OSError:
+                continue
+            self.swept += 1
+        if self.swept:
+            print(f"🧹 Removed {self.swept} stale scratch file(s) from {self.directory}")
+
+    def _take(self, nbytes, timeout):
+        with self._space:
+            if not self._space.wait_for(lambda: self.used + nbytes <= self.max_bytes, timeout):
+                self.rejected += 1
+                raise ServerBusy(f'scratch space full ({self.max_bytes // (1024 * 1024)} MB), retry later')
+            self.used += nbytes
+            self.peak = max(self.peak, self.used)
+
+    def _give(self, nbytes):
+        with self._space:
+            self.used -= nbytes
+            self._space.notify_all()
+
+    @contextmanager
+    def file(self, suffix=''):
+        """A ScratchFile that's removed, and its reservation returned, on the way out"""
+        scratch_file = ScratchFile(self, os.path.join(
+            self.directory, f'{os.getpid()}-{uuid.uuid4().hex}{suffix}'))
+        with self._space:
+            self._open.add(scratch_file.path)
+            self.files += 1
+        try:
+            yield scratch_file
+        finally:
+            try:
+                os.unlink(scratch_file.path)
+            except FileNotFoundError:
+                pass
+            scratch_file.trim(0)
+            with self._space:
+                self._open.discard(scratch_file.path)
+
+    def remove_open(self):
+        """Remove files still in use by this process (at interpreter exit)"""
+        with self._space:
+            paths = list(self._open)
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._space:
+            return {
+                'directory': self.directory,
+                'ram_backed': self.ram_backed,
+                'bytes': self.used,
+                'peak_bytes': self.peak,
+                'max_bytes': self.max_bytes,
+                'open_files': len(self._open),
+                'files': self.files,
+                'rejected': self.rejected,
+                'swept': self.swept,
+            }
+
+
+class ScratchFile:
+    """One scratch path plus the bytes reserved for it in its ScratchSpace"""
+
+    def __init__(self, space, path):
+        self.space = space
+        self.path = path
+        self.reserved = 0
+
+    def reserve(self, nbytes, timeout=0):
+        """Grow the reservation to nbytes, waiting up to timeout (None: forever) for room"""
+        if nbytes > self.space.max_bytes:
+            raise VideoTooLarge(f'video needs {nbytes} bytes of scratch space, limit is {self.space.max_bytes}')
+        if nbytes > self.reserved:
+            self.space._take(nbytes - self.reserved, timeout)
+            self.reserved = nbytes
+
+    def trim(self, nbytes):
+        """Shrink the reservation to what the file actually uses, handing the rest back"""
+        if nbytes < self.reserved:
+            self.space._give(self.reserved - nbytes)
+            self.reserved = nbytes
+
+
+scratch = ScratchSpace(SCRATCH_DIR, SCRATCH_MAX_BYTES)
+scratch.sweep()
+atexit.register(scratch.remove_open)
+
+
+def run_ffmpeg(args, timeout=FFMPEG_TIMEOUT, queue_timeout=FFMPEG_QUEUE_TIMEOUT, input_data=None):
+    """Run ffmpeg quietly and return its stdout; raise FFmpegError with stderr on failure
+
+    Waits up to queue_timeout seconds for a free ffmpeg slot (ServerBusy after).
+    input_data, if given, is fed to ffmpeg as pipe:0.
+    """
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        return run_ffmpeg_held(args, timeout, input_data)
+    finally:
+        ffmpeg_limiter.release()
+
+
+def run_ffmpeg_held(args, timeout=FFMPEG_TIMEOUT, input_data=None):
+    """run_ffmpeg() for callers already holding an ffmpeg slot across several runs"""
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + args,
+        input=input_data, capture_output=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        message = result.stderr.decode(errors='replace').strip()
+        error = SourceError if SOURCE_ERRORS.search(message) else FFmpegError
+        raise error(message[-500:] or f'ffmpeg exited with status {result.returncode}')
+    return result.stdout
+
+
+def make_http_adapter():
+    retry = Retry(
+        total=HTTP_RETRIES, backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True, raise_on_status=False,
+    )
+    # pool_block=False: requests never passes a pool timeout, so a blocking pool
+    # would leave a thread waiting on a busy host with no deadline at all
+    return HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST,
+                       pool_block=False, max_retries=retry)
+
+
+http_adapter = make_http_adapter()
+_http_local = threading.local()
+
+
+def http_session():
+    """This thread's Session, mounted on the shared (thread-safe) connection pool
+
+    Sessions themselves aren't safe to share between threads (cookie jar,
+    mounts), so each thread gets its own; the adapter's pools are shared.
+    """
+    session = getattr(_http_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.mount('http://', http_adapter)
+        session.mount('https://', http_adapter)
+        _http_local.session = session
+    return session
+
+
+def http_pool_stats():
+    """Requests vs new connections per pooled host; reuse_rate = share of requests on a kept-alive connection"""
+    pools = http_adapter.poolmanager.pools
+    hosts = {}
+    for key in list(pools.keys()):
+        try:
+            pool = pools[key]
+        except KeyError:
+            continue  # evicted meanwhile
+        hosts[f'{key.key_scheme}://{key.key_host}:{key.key_port}'] = {
+            'requests': pool.num_requests,
+            'connections': pool.num_connections,
+        }
+    requests_made = sum(host['requests'] for host in hosts.values())
+    connections = sum(host['connections'] for host in hosts.values())
+    return {
+        'requests': requests_made,
+        'connections': connections,
+        'reuse_rate': round(1 - connections / requests_made, 3) if requests_made else None,
+        'per_host_kept': POOL_PER_HOST,
+        'hosts': hosts,
+    }
+
+
+def is_http_url(url):
+    return urlsplit(url).scheme.lower() in ('http', 'https')
+
+
+def input_args(source, at):
+    """ffmpeg input options for a local path or http(s) URL, seeking to `at` seconds
+
+    -ss goes before -i so ffmpeg seeks to the nearest keyframe instead of
+    decoding from the start; for URLs that seek becomes an HTTP range read.
+    """
+    args = ['-ss', str(at)]
+    if is_http_url(source):
+        args += [
+            # Only network protocols - a crafted URL must not reach local files
+            '-protocol_whitelist', 'http,https,tcp,tls,crypto',
+            '-rw_timeout', str(int(READ_TIMEOUT * 1000000)),
+        ]
+    return args + ['-i', source]
+
+
+CropBox = namedtuple('CropBox', 'top bottom left right')  # pixels removed from each edge
+FIXED_CROP = CropBox(0, CROP_BOTTOM, 0, 0)
+
+
+def crop_filter(crop):
+    return f'crop=iw-{crop.left + crop.right}:ih-{crop.top + crop.bottom}:{crop.left}:{crop.top}'
+
+
+def crop_pixels(pixels, crop):
+    height, width = pixels.shape[:2]
+    return pixels[crop.top:height - crop.bottom, crop.left:width - crop.right]
+
+
+def extract_clean_frame(source, at=FRAME_TIME, crop=FIXED_CROP, image_format='jpeg',
+                        queue_timeout=FFMPEG_QUEUE_TIMEOUT, candidates=FRAME_CANDIDATES):
+    """Grab one frame, crop the watermark away and return it as JPEG/WebP bytes
+
+    Crop and encode happen inside the one ffmpeg process and the image comes
+    back over stdout - no intermediate files and a single encode. With more
+    than one candidate the best frame near `at` is picked instead.
+    """
+    if candidates > 1:
+        return extract_best_frame(source, at, crop, image_format, queue_timeout, candidates)
+
+    output_args, _ = IMAGE_FORMATS[image_format]
+    image = run_ffmpeg(input_args(source, at) + [
+        '-vframes', '1',
+        '-vf', crop_filter(crop),
+    ] + output_args + ['pipe:1'], queue_timeout=queue_timeout)
+    if not image:
+        # Seeking past the end isn't an error to ffmpeg, it just writes nothing
+        raise FFmpegError(f'no frames decoded around {at}s')
+    return image
+
+
+PPM_HEADER = re.compile(rb'P6\s+(\d+)\s+(\d+)\s+255\s')
+
+
+def split_ppm(data):
+    """Split ffmpeg's image2pipe PPM stream into (ppm bytes, width, height, header length)"""
+    frames, pos = [], 0
+    while pos < len(data):
+        match = PPM_HEADER.match(data, pos)
+        if not match:
+            raise FFmpegError('unexpected data in ffmpeg frame stream')
+        width, height = int(match.group(1)), int(match.group(2))
+        end = match.end() + width * height * 3
+        frames.append((data[pos:end], width, height, match.end() - pos))
+        pos = end
+    return frames
+
+
+def ppm_pixels(frame):
+    """HxWx3 uint8 view of one (ppm, width, height, header) frame from split_ppm()"""
+    ppm, width, height, header = frame
+    return np.frombuffer(ppm, np.uint8, width * height * 3, header).reshape(height, width, 3)
+
+
+def load_frame_scoring():
+    """frame_scoring.py from beside this file (shared with create_poster.py), wherever we run from"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frame_scoring.py')
+    spec = importlib.util.spec_from_file_location('frame_scoring', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+score_frames = load_frame_scoring().score_frames if np is not None else None
+
+
+def extract_best_frame(source, at=FRAME_TIME, crop=FIXED_CROP, image_format='jpeg',
+                       queue_timeout=FFMPEG_QUEUE_TIMEOUT, candidates=FRAME_CANDIDATES,
+                       window=FRAME_WINDOW):
+    """Decode `candidates` cropped frames around `at` in one pass and encode the best-scoring one
+
+    Holds one ffmpeg slot throughout, so a request that got to decode can't
+    be turned away at the encode step. The winner is encoded with Pillow when
+    it's installed, else by a second ffmpeg run in the same slot.
+    """
+    start = max(0.0, at - window / 2)
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        # Candidates only come from reference frames: skipping the B-frames nothing
+        # depends on cuts decode time by about a third and leaves plenty to pick from
+        stream = run_ffmpeg_held(['-skip_frame', 'noref'] + input_args(source, start) + [
+            '-t', str(window),
+            # fps first so only the candidates get cropped and converted
+            '-vf', f'fps={candidates / window},{crop_filter(crop)}',
+            '-frames:v', str(candidates),
+            '-c:v', 'ppm', '-f', 'image2pipe', 'pipe:1',
+        ])
+        frames = split_ppm(stream)
+        if not frames:
+            raise FFmpegError(f'no frames decoded around {at}s')
+
+        pixels = [ppm_pixels(frame) for frame in frames]
+        best = int(np.argmax(score_frames(pixels)))
+        if Image is not None:
+            return encode_pil(Image.fromarray(pixels[best]), image_format)
+        output_args, _ = IMAGE_FORMATS[image_format]
+        return run_ffmpeg_held(['-f', 'ppm_pipe', '-i', 'pipe:0'] + output_args + ['pipe:1'],
+                               input_data=frames[best][0])
+    finally:
+        ffmpeg_limiter.release()
+
+
+class RangeReader(io.RawIOBase):
+    """Seekable read-only file over HTTP range requests, for the in-process decoder
+
+    Reads go out as RANGE_BLOCK_SIZE blocks on the pooled session and the last
+    few blocks are kept, so the demuxer's small back-and-forth reads (moov atom,
+    then frame data) cost a handful of requests rather than one per read.
+    """
+
+    def __init__(self, url, block_size=RANGE_BLOCK_SIZE, keep_blocks=8):
+        self.url = url
+        self.block_size = block_size
+        self.keep_blocks = keep_blocks
+        self.blocks = OrderedDict()
+        self.pos = 0
+        self.size = None
+        self.requests = 0
+        self._block(0)  # learns the size; fails fast if the host ignores Range
+
+    def _block(self, index):
+        if index in self.blocks:
+            self.blocks.move_to_end(index)
+            return self.blocks[index]
+
+        start = index * self.block_size
+        headers = {'Range': f'bytes={start}-{start + self.block_size - 1}'}
+        try:
+            with http_session().get(self.url, headers=headers, stream=True,
+                                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+                self.requests += 1
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                if not response.ok:
+                    raise SourceError(f'video host returned HTTP {response.status_code}')
+                if response.status_code != 206 or not total.isdigit():
+                    raise SourceError(f'no range support from video host (HTTP {response.status_code})')
+                block = response.content
+        except requests.RequestException as e:
+            raise SourceError(f'range request failed: {e}') from e
+
+        self.size = int(total)
+        self.blocks[index] = block
+        if len(self.blocks) > self.keep_blocks:
+            self.blocks.popitem(last=False)
+        return block
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: self.size}[whence]
+        self.pos = max(0, base + offset)
+        return self.pos
+
+    def readinto(self, buffer):
+        if self.pos >= self.size:
+            return 0
+        index, offset = divmod(self.pos, self.block_size)
+        block = self._block(index)
+        count = min(len(buffer), len(block) - offset)
+        buffer[:count] = block[offset:offset + count]
+        self.pos += count
+        return count
+
+
+def open_video(source):
+    """av.open() a path, or a URL through RangeReader; failing to open raises SourceError"""
+    try:
+        return av.open(RangeReader(source) if is_http_url(source) else source)
+    except av.FFmpegError as e:
+        raise SourceError(str(e)) from e
+
+
+def pyav_frames(source, targets, skip_nonref=False):
+    """Yield (time, RGB array) for the first frame at or after each target time
+
+    One open of the source and one forward pass that only decodes what it
+    must: packets are demuxed ahead of the next target and held undecoded,
+    and a keyframe at or before the target drops everything held so far, so
+    decoding restarts from the last keyframe before each target. Targets
+    more than FRAME_SEEK_GAP seconds ahead are reached by seeking instead,
+    which skips reading the bytes in between as well.
+    """
+    try:
+        with open_video(source) as container:
+            stream = container.streams.video[0]
+            codec = stream.codec_context
+            if skip_nonref:
+                codec.skip_frame = 'NONREF'
+
+            pending = list(targets)
+            while pending:
+                container.seek(int(pending[0] / stream.time_base), stream=stream)
+                held, restart, reseek = [], False, False
+                for packet in container.demux(stream):
+                    if packet.pts is None:  # end of the video: drain the decoder
+                        packets = [] if restart else [packet]
+                    elif held is None:  # decoding straight through
+                        packets = [packet]
+                    else:
+                        at = float(packet.pts * packet.time_base)
+                        if packet.is_keyframe and at <= pending[0] + 0.001:
+                            held, restart = [], True
+                        held.append(packet)
+                        if at < pending[0] - 0.001:
+                            continue
+                        if restart:
+                            codec.flush_buffers()
+                        packets, held, restart = held, None, False
+
+                    for frame in (f for p in packets for f in codec.decode(p)):
+                        if frame.time is None or frame.time < pending[0] - 0.001:
+                            continue
+                        yield frame.time, frame.to_ndarray(format='rgb24')
+                        # A sparse stream can cover several targets with one frame
+                        while pending and pending[0] <= frame.time + 0.001:
+                            pending.pop(0)
+                        if not pending:
+                            return
+                        if pending[0] - frame.time > FRAME_SEEK_GAP:
+                            reseek = True
+                            break
+                        held = []  # look ahead for the next target
+                    if reseek:
+                        break
+                else:
+                    return  # end of the video
+    except av.FFmpegError as e:
+        raise FFmpegError(str(e)) from e
+
+
+def pyav_clean_frame(source, at=FRAME_TIME, crop=FIXED_CROP, image_format='jpeg',
+                     queue_timeout=FFMPEG_QUEUE_TIMEOUT, candidates=FRAME_CANDIDATES,
+                     window=FRAME_WINDOW):
+    """In-process extract_clean_frame(): PyAV decodes, NumPy crops and scores, Pillow encodes"""
+    if candidates > 1:
+        start = max(0.0, at - window / 2)
+        targets = [start + window * i / candidates for i in range(candidates)]
+    else:
+        targets = [at]
+
+    # Same slots as the subprocesses - decoding costs the same CPU either way
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        frames = [crop_pixels(pixels, crop)
+                  for _, pixels in pyav_frames(source, targets, skip_nonref=candidates > 1)]
+        if not frames:
+            raise FFmpegError(f'no frames decoded around {at}s')
+        best = frames[int(np.argmax(score_frames(frames)))] if len(frames) > 1 else frames[0]
+        return encode_pil(Image.fromarray(best), image_format)
+    finally:
+        ffmpeg_limiter.release()
+
+
+def encode_pil(image, image_format):
+    pil_format, options = PIL_FORMATS[image_format]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def fit_width(image, width):
+    """Scale a Pillow image to `width`, keeping the aspect ratio with an even height (like scale=W:-2)"""
+    if image.width == width:
+        return image
+    height = max(2, round(image.height * width / image.width / 2) * 2)
+    return image.resize((width, height), Image.BICUBIC)
+
+
+def pyav_frame_set(source, times, convert, crop=FIXED_CROP,
+                   queue_timeout=FFMPEG_QUEUE_TIMEOUT):
+    """[(time, convert(image))] for each timestamp, decoded in-process in one pass
+
+    Frames are converted as they're decoded, so only the converted results
+    (encoded images or thumbnails) are held, never every full frame.
+    """
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        return [
+            (round(at, 3), convert(Image.fromarray(crop_pixels(pixels, crop))))
+            for at, pixels in pyav_frames(source, times)
+        ]
+    finally:
+        ffmpeg_limiter.release()
+
+
+def ffmpeg_frame_set(source, times, convert, crop=FIXED_CROP, tile_width=None,
+                     queue_timeout=FFMPEG_QUEUE_TIMEOUT):
+    """[(time, convert(image))] for each timestamp, one ffmpeg run per cluster of timestamps
+
+    Timestamps within FRAME_SEEK_GAP of each other share a run, whose select
+    filter keeps the first frame at or after each one (relative to the seek
+    point); longer gaps start a new run that input-seeks past them. ffmpeg
+    doesn't report which frame it picked, so the requested times are returned.
+    """
+    clusters = [[times[0]]]
+    for at in times[1:]:
+        if at - clusters[-1][-1] > FRAME_SEEK_GAP:
+            clusters.append([])
+        clusters[-1].append(at)
+
+    frames = []
+    # One slot for every cluster, so a set can't fail part-way with ServerBusy
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        for cluster in clusters:
+            start = cluster[0]
+            select = '+'.join(f'gte(t,{at - start:.3f})*(isnan(prev_t)+lt(prev_t,{at - start:.3f}))'
+                              for at in cluster)
+            filters = [f"select='{select}'", crop_filter(crop)]
+            if tile_width:
+                filters.append(f'scale={tile_width}:-2')
+            stream = run_ffmpeg_held(input_args(source, start) + [
+                '-t', f'{cluster[-1] - start + 1:.3f}',
+                '-vf', ','.join(filters),
+                '-fps_mode', 'passthrough',
+                '-frames:v', str(len(cluster)),
+                '-c:v', 'ppm', '-f', 'image2pipe', 'pipe:1',
+            ])
+            decoded = [(at, convert(Image.open(io.BytesIO(ppm))))
+                       for at, (ppm, *_) in zip(cluster, split_ppm(stream))]
+            frames.extend(decoded)
+            if len(decoded) < len(cluster):
+                break  # ran off the end of the video
+    finally:
+        ffmpeg_limiter.release()
+    return frames
+
+
+decode_counts = {'pyav': 0, 'ffmpeg': 0, 'fallbacks': 0}
+_decode_counts_lock = threading.Lock()
+
+
+def count_decode(kind):
+    with _decode_counts_lock:
+        decode_counts[kind] += 1
+
+
+def decode_stats():
+    with _decode_counts_lock:
+        return dict(decode_counts)
+
+
+def run_decoder(pyav_call, ffmpeg_call, backend=None):
+    """Run pyav_call() on the in-process backend, falling back to ffmpeg_call() on error"""
+    if (backend or ACTIVE_DECODE_BACKEND) == 'pyav':
+        try:
+            result = pyav_call()
+            count_decode('pyav')
+            return result
+        except ServerBusy:
+            raise
+        except Exception as e:
+            print(f"⚠️  In-process decode failed, using ffmpeg: {e}")
+            count_decode('fallbacks')
+
+    result = ffmpeg_call()
+    count_decode('ffmpeg')
+    return result
+
+
+def decode_clean_frame(source, image_format='jpeg', queue_timeout=FFMPEG_QUEUE_TIMEOUT,
+                       backend=None, crop=FIXED_CROP):
+    """Cleaned frame from the active decode backend; PyAV errors fall back to ffmpeg"""
+    return run_decoder(
+        lambda: pyav_clean_frame(source, crop=crop, image_format=image_format,
+                                 queue_timeout=queue_timeout),
+        lambda: extract_clean_frame(source, crop=crop, image_format=image_format,
+                                    queue_timeout=queue_timeout),
+        backend,
+    )
+
+
+def build_sprite(frames, columns, image_format):
+    """Paste (time, thumbnail) pairs into a grid; returns (sheet bytes, index of tile offsets)"""
+    tile_width, tile_height = frames[0][1].size
+    columns = min(columns, len(frames))
+    rows = -(-len(frames) // columns)
+    sheet = Image.new('RGB', (columns * tile_width, rows * tile_height))
+    index = []
+    for i, (at, thumbnail) in enumerate(frames):
+        x, y = (i % columns) * tile_width, (i // columns) * tile_height
+        sheet.paste(thumbnail, (x, y))
+        index.append({'time': at, 'x': x, 'y': y})
+    return encode_pil(sheet, image_format), {
+        'tile_width': tile_width,
+        'tile_height': tile_height,
+        'columns': columns,
+        'rows': rows,
+        'frames': index,
+    }
+
+
+def decode_frame_set(source, frame_set, image_format='jpeg', queue_timeout=FFMPEG_QUEUE_TIMEOUT,
+                     crop=FIXED_CROP):
+    """Cleaned frames at every requested timestamp from one decode pass, as a JSON-able payload"""
+    times = frame_set['times']
+    sprite = frame_set['layout'] == 'sprite'
+    tile_width = frame_set['tile_width'] if sprite else None
+    if sprite:
+        convert = lambda image: fit_width(image, tile_width)
+    else:
+        convert = lambda image: encode_pil(image, image_format)
+
+    frames = run_decoder(
+        lambda: pyav_frame_set(source, times, convert, crop, queue_timeout=queue_timeout),
+        lambda: ffmpeg_frame_set(source, times, convert, crop, tile_width=tile_width,
+                                 queue_timeout=queue_timeout),
+    )
+    if not frames:
+        raise FFmpegError('no frames decoded at the requested timestamps')
+
+    _, mimetype = IMAGE_FORMATS[image_format]
+    payload = {'success': True, 'layout': frame_set['layout'], 'requested': len(times)}
+    if not sprite:
+        payload['frames'] = [
+            {'time': at, 'image_url': f'data:{mimetype};base64,{base64.b64encode(image).decode()}'}
+            for at, image in frames
+        ]
+        return payload
+
+    sheet, index = build_sprite(frames, frame_set['columns'], image_format)
+    payload['sprite_url'] = f'data:{mimetype};base64,{base64.b64encode(sheet).decode()}'
+    payload['index'] = index
+    return payload
+
+
+def probe_video(source):
+    """(width, height, duration in seconds or None) of the first video stream, from the header"""
+    try:
+        with open_video(source) as container:
+            stream = container.streams.video[0]
+            if stream.duration:
+                duration = float(stream.duration * stream.time_base)
+            else:
+                duration = container.duration / av.time_base if container.duration else None
+            return stream.codec_context.width, stream.codec_context.height, duration
+    except av.FFmpegError as e:
+        raise FFmpegError(str(e)) from e
+
 
+def keyframe_samples(source, times):
+    """RGB arrays of the keyframe at or before each time, skipping repeats
+
+    Only keyframes get decoded (one per seek), so sampling a long clip costs
+    a few frames of decode rather than everything in between.
+    """
+    try:
+        with open_video(source) as container:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = 'NONKEY'
+            seen = set()
+            for at in times:
+                container.seek(int(at / stream.time_base), stream=stream)
+                frame = next(container.decode(stream), None)
+                if frame is not None and frame.pts not in seen:
+                    seen.add(frame.pts)
+                    yield frame.to_ndarray(format='rgb24')
+    except av.FFmpegError as e:
+        raise FFmpegError(str(e)) from e
+
+
+def overlay_regions(luma):
+    """Bounding boxes (y0, y1, x0, x1) of static detail in a stack of luma frames
+
+    A pixel belongs to an overlay when it barely changes across the samples
+    and sits on a sharp edge of their average - burned-in text and logos.
+    Hits are pooled into 8x8 cells and joined into regions. Only regions
+    that stay within the top or bottom band count: static detail that runs on
+    into the middle of the frame is scenery from a locked-off shot, and since
+    it could hide an overlay touching it, that makes the result None.
+    """
+    mean = luma.mean(axis=0)
+    across = np.abs(np.diff(mean, axis=1)) > DETECT_EDGE
+    down = np.abs(np.diff(mean, axis=0)) > DETECT_EDGE
+    edges = np.zeros(mean.shape, bool)
+    edges[:, 1:] |= across
+    edges[:, :-1] |= across
+    edges[1:, :] |= down
+    edges[:-1, :] |= down
+    overlay = edges & (luma.std(axis=0) < DETECT_STILL_STD)
+
+    height, width = overlay.shape
+    rows, cols = -(-height // 8), -(-width // 8)
+    padded = np.zeros((rows * 8, cols * 8), bool)
+    padded[:height, :width] = overlay
+    cells = padded.reshape(rows, 8, cols, 8).sum(axis=(1, 3)) >= 4
+    band = max(1, round(rows * DETECT_BAND))
+
+    regions, seen = [], np.zeros_like(cells)
+    for start in zip(*np.nonzero(cells)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        stack, members = [start], []
+        while stack:
+            r, c = stack.pop()
+            members.append((r, c))
+            for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                    if cells[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+        top, bottom = min(r for r, _ in members), max(r for r, _ in members)
+        if band <= bottom and top < rows - band:
+            if top < band or bottom >= rows - band:
+                return None
+            continue
+        left, right = min(c for _, c in members), max(c for _, c in members)
+        ys, xs = np.nonzero(padded[top * 8:(bottom + 1) * 8, left * 8:(right + 1) * 8])
+        regions.append((int(top * 8 + ys.min()), int(top * 8 + ys.max() + 1),
+                        int(left * 8 + xs.min()), int(left * 8 + xs.max() + 1)))
+    return regions
+
+
+def detect_crop(source, width, height, duration=None, margin=8):
+    """Smallest border crop that removes every static overlay, or None if it can't tell
+
+    Samples are keyframes where the video has enough of them; a short clip
+    with a long GOP has only one or two, so then the actual frame at each
+    sample time is decoded instead.
+
+    Finding no overlay at all counts as can't tell: the watermark may just
+    have been too faint or too mobile to show up in the samples. Each region
+    can be cut away from any of the four edges; every assignment is tried
+    and the one that keeps the most pixels wins.
+    """
+    span = min(duration or DETECT_SPAN, DETECT_SPAN)
+    times = [span * (i + 0.5) / DETECT_SAMPLES for i in range(DETECT_SAMPLES)]
+    samples = list(keyframe_samples(source, times))
+    if len(samples) < 3:
+        samples = [pixels for _, pixels in pyav_frames(source, times, skip_nonref=True)]
+    samples = [pixels[::4, ::4] for pixels in samples]
+    if len(samples) < 3:
+        return None  # too short to tell an overlay from the picture
+    luma = np.stack(samples).astype(np.float32) @ np.array([0.299, 0.587, 0.114], np.float32)
+
+    regions = overlay_regions(luma)
+    if not regions or len(regions) > DETECT_MAX_REGIONS:
+        return None
+    # Back to full-resolution pixels, padded by the sampling step plus a margin
+    regions = [(max(0, y0 * 4 - margin), min(height, y1 * 4 + margin),
+                max(0, x0 * 4 - margin), min(width, x1 * 4 + margin))
+               for y0, y1, x0, x1 in regions]
+
+    best_kept, best = -1, None
+    for sides in product(range(4), repeat=len(regions)):
+        crop = [0, 0, 0, 0]
+        for (y0, y1, x0, x1), side in zip(regions, sides):
+            crop[side] = max(crop[side], (y1, height - y0, x1, width - x0)[side])
+        kept = max(0, width - crop[2] - crop[3]) * max(0, height - crop[0] - crop[1])
+        if kept > best_kept:
+            best_kept, best = kept, crop
+    if best_kept < width * height * (1 - DETECT_MAX_CROP):
+        return None
+    return CropBox(*(value + value % 2 for value in best))  # even sizes for the encoders
+
+
+def video_site(video_url):
+    """Which site a video comes from: its full host name
+
+    Hosts under one domain can serve unrelated videos (every project on
+    supabase.co, every shop on a .co.uk), so nothing shorter is assumed to
+    share overlays. Callers that know better pass 'site' to share a profile.
+    """
+    return (urlsplit(video_url).hostname or '').lower()
+
+
+class CropProfiles:
+    """Detected crops keyed by "site/WxH", kept in one JSON file
+
+    A crop only becomes the site's profile once `votes` videos in a row
+    detect the same one, and expires `ttl` seconds after it was last
+    confirmed, so one odd video or a site redesign can't pin a wrong crop.
+    The file is re-read before every detection and rewritten atomically
+    after it, so worker processes pick up each other's profiles.
+    """
+
+    def __init__(self, path, votes=CROP_PROFILE_VOTES, ttl=CROP_PROFILE_TTL):
+        self.path = path
+        self.votes = votes
+        self.ttl = ttl
+        self.hits = 0
+        self.detections = 0
+        self._lock = threading.Lock()
+        self._profiles = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _settled(self, profile):
+        return (profile is not None and profile.get('votes', 1) >= self.votes
+                and time.time() - profile['detected'] < self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            if not self._settled(self._profiles.get(key)):
+                self._profiles = self._load()
+            profile = self._profiles.get(key)
+            if not self._settled(profile):
+                return None
+            self.hits += 1
+        return CropBox(**profile['crop'])
+
+    def put(self, key, crop):
+        """Count one detection of crop for key"""
+        with self._lock:
+            self.detections += 1
+            self._profiles = self._load()
+            profile = self._profiles.get(key)
+            votes = 1
+            if (profile is not None and profile['crop'] == crop._asdict()
+                    and time.time() - profile['detected'] < self.ttl):
+                votes = profile.get('votes', 1) + 1
+            self._profiles = {k: p for k, p in self._profiles.items()
+                              if time.time() - p['detected'] < self.ttl}
+            self._profiles[key] = {'crop': crop._asdict(), 'detected': round(time.time()),
+                                   'votes': votes}
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._profiles, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️  Could not save crop profiles: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {'profiles': sum(map(self._settled, self._profiles.values())),
+                    'hits': self.hits, 'detections': self.detections}
+
+
+crop_profiles = CropProfiles(CROP_PROFILES)
+
+
+def crop_for(source, video_url, crop_mode=CROP_MODE, site=None, queue_timeout=FFMPEG_QUEUE_TIMEOUT):
+    """The crop to apply to source: the site's settled profile, else detected for this video"""
+    if crop_mode != 'auto' or not AUTO_CROP:
+        return FIXED_CROP
+    width, height, duration = probe_video(source)
+    key = f'{site or video_site(video_url)}/{width}x{height}'
+    crop = crop_profiles.get(key)
+    if crop is not None:
+        return crop
+
+    ffmpeg_limiter.acquire(queue_timeout)
+    try:
+        crop = detect_crop(source, width, height, duration)
+    finally:
+        ffmpeg_limiter.release()
+    if crop is None:
+        return FIXED_CROP  # nothing conclusive - don't pin the whole site to a guess
+    print(f"🔍 Crop profile for {key}: {crop._asdict()}")
+    crop_profiles.put(key, crop)
+    return crop
+
+
+def normalize_url(url):
+    """Canonical form of a video URL for cache keys: lower-case host, no default
+    port, fragment or signing parameters, remaining query sorted"""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if parts.port and (parts.scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in VOLATILE_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), host, parts.path or '/', urlencode(query), ''))
+
+
+def cache_key(video_url, content_hash=None, **params):
+    """Key a result by the video (content hash if the caller has one, else its
+    normalized URL) plus every option that changes the output image"""
+    source = f'sha256:{str(content_hash).lower()}' if content_hash else normalize_url(video_url)
+    payload = json.dumps({'source': source, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Bounded on-disk cache of cleaned frames
+
+    One file per key. The file's mtime is when it was stored (for the TTL)
+    and its atime is set on every hit (for LRU eviction), so the index
+    survives restarts and is shared by every worker process on the box.
+    """
+
+    def __init__(self, directory, max_bytes, ttl):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = os.stat(path).st_mtime
+            if time.time() - stored_at > self.ttl:
+                os.unlink(path)
+                raise FileNotFoundError(path)
+            with open(path, 'rb') as f:
+                value = f.read()
+            if not value:
+                # Left by an older version that cached failed extracts
+                os.unlink(path)
+                raise FileNotFoundError(path)
+            os.utime(path, (time.time(), stored_at))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.enabled or not value or len(value) > self.max_bytes:
+            return  # an empty result is a failed extract, never something to serve again
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_bytes()
+            else:
+                self._approx_bytes += len(value)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                try:
+                    yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+    def _scan_bytes(self):
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until 90% full"""
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda item: item[1].st_atime)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes * 0.9 and now - stat.st_mtime <= self.ttl:
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            self.evictions += 1
+        self._approx_bytes = total
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'bytes': self._approx_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+result_cache = ResultCache(CACHE_DIR, CACHE_MAX_BYTES, CACHE_TTL)
+
+
+def with_video_source(video_url, input_mode, decode, queue_timeout=FFMPEG_QUEUE_TIMEOUT):
+    """Call decode(source) on the URL itself, falling back to a downloaded copy if it can't be read"""
+    if input_mode == 'url':
+        try:
+            # The decoder fetches only what it needs to reach the frame
+            return decode(video_url)
+        except SourceError:
+            # e.g. a host that doesn't support range requests; anything else
+            # (no frame at that time, a corrupt stream) would only fail again
+            pass
+
+    # Download video (streamed to scratch space, never held in memory; removed
+    # when the block exits, whether decoding worked or not)
+    with scratch.file('.mp4') as video_file:
+        download_video(video_url, video_file, queue_timeout=queue_timeout)
+        return decode(video_file.path)
+
+
+def clean_frame(video_url, input_mode=INPUT_MODE, image_format='jpeg',
+                queue_timeout=FFMPEG_QUEUE_TIMEOUT, crop_mode=CROP_MODE, site=None):
+    """Produce the cleaned frame for video_url, falling back from url to download input"""
+    # Extract frame at 2 seconds and crop the watermark away, in memory
+    def decode(source):
+        crop = crop_for(source, video_url, crop_mode, site, queue_timeout)
+        return decode_clean_frame(source, image_format=image_format, queue_timeout=queue_timeout,
+                                  crop=crop)
+
+    return with_video_source(video_url, input_mode, decode, queue_timeout)
+
+
+def crop_params(video_url, crop_mode, site):
+    """Cache key fields for the crop: the fixed strip, or the site whose profile applies"""
+    if crop_mode == 'auto' and AUTO_CROP:
+        return {'crop': 'auto', 'site': site or video_site(video_url)}
+    return {'crop_bottom': CROP_BOTTOM}
+
+
+def cached_clean_frame(video_url, input_mode=INPUT_MODE, image_format='jpeg',
+                       content_hash=None, use_cache=True, queue_timeout=FFMPEG_QUEUE_TIMEOUT,
+                       crop_mode=CROP_MODE, site=None):
+    """clean_frame() through the result cache; returns (image bytes, cache hit)"""
+    key = cache_key(video_url, content_hash, at=FRAME_TIME, format=image_format,
+                    candidates=FRAME_CANDIDATES, window=FRAME_WINDOW,
+                    backend=ACTIVE_DECODE_BACKEND, **crop_params(video_url, crop_mode, site))
+    if use_cache:
+        image = result_cache.get(key)
+        if image is not None:
+            return image, True
+
+    image = clean_frame(video_url, input_mode, image_format, queue_timeout, crop_mode, site)
+    if image:
+        result_cache.put(key, image)
+    return image, False
+
+
+def cached_frame_set(video_url, frame_set, input_mode=INPUT_MODE, image_format='jpeg',
+                     content_hash=None, use_cache=True, queue_timeout=FFMPEG_QUEUE_TIMEOUT,
+                     crop_mode=CROP_MODE, site=None):
+    """Multi-frame payload through the result cache; returns (payload dict, cache hit)"""
+    key = cache_key(video_url, content_hash, format=image_format, backend=ACTIVE_DECODE_BACKEND,
+                    **crop_params(video_url, crop_mode, site), **frame_set)
+    if use_cache:
+        cached = result_cache.get(key)
+        if cached is not None:
+            return json.loads(cached), True
+
+    def decode(source):
+        crop = crop_for(source, video_url, crop_mode, site, queue_timeout)
+        return decode_frame_set(source, frame_set, image_format, queue_timeout, crop)
+
+    payload = with_video_source(video_url, input_mode, decode, queue_timeout)
+    if payload.get('frames') or payload.get('sprite_url'):
+        result_cache.put(key, json.dumps(payload).encode())
+    return payload, False
+
+
+class MemoryJobStore:
+    """Jobs in a dict; lost on restart and private to this process"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id, options):
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id, 'status': 'queued', 'options': options, 'created': time.time(),
+                'started': None, 'finished': None, 'error': None, 'error_code': None,
+                'cache': None, 'mimetype': None, 'result': None,
+            }
+
+    def claim_next(self, owner, lease_until):
+        """Mark the oldest queued job running; returns (job id, options), or None if there's none"""
+        with self._lock:
+            queued = [job for job in self._jobs.values() if job['status'] == 'queued']
+            if not queued:
+                return None
+            job = min(queued, key=lambda job: job['created'])
+            job.update(status='running', started=time.time())
+            return job['id'], job['options']
+
+    def renew(self, job_ids, owner, lease_until):
+        pass  # every job here belongs to this process
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def count_queued(self):
+        with self._lock:
+            return sum(job['status'] == 'queued' for job in self._jobs.values())
+
+    def recover(self, now):
+        return 0
+
+    def purge(self, before):
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items()
+                           if job['finished'] and job['finished'] < before]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Jobs in a local SQLite file, shared by every process on the host
+
+    A claimed job records its owner's pid and a lease time the owner keeps
+    pushing forward while the job runs. Only a job whose owner died or
+    stopped renewing goes back to the queue, so two processes never run the
+    same job, and any process's workers pick up jobs queued by any other.
+    """
+
+    name = 'sqlite'
+    COLUMNS = ('id', 'status', 'options', 'created', 'started', 'finished',
+               'error', 'error_code', 'cache', 'mimetype', 'result')
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, status TEXT NOT NULL, options TEXT NOT NULL,
+                created REAL NOT NULL, started REAL, finished REAL,
+                error TEXT, error_code INTEGER, cache TEXT, mimetype TEXT, result BLOB,
+                owner INTEGER, lease REAL)""")
+            # Files created before jobs had owners
+            existing = {row[1] for row in db.execute('PRAGMA table_info(jobs)')}
+            for column, kind in (('owner', 'INTEGER'), ('lease', 'REAL')):
+                if column not in existing:
+                    db.execute(f'ALTER TABLE jobs ADD COLUMN {column} {kind}')
+            db.execute('CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished)')
+            db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)')
+
+    def _connect(self):
+        # A connection per call keeps the store safe to use from any thread
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, job_id, options):
+        with self._connect() as db:
+            db.execute('INSERT INTO jobs (id, status, options, created) VALUES (?, ?, ?, ?)',
+                       (job_id, 'queued', json.dumps(options), time.time()))
+
+    def claim_next(self, owner, lease_until):
+        with self._connect() as db:
+            while True:
+                row = db.execute("SELECT id, options FROM jobs WHERE status = 'queued' "
+                                 "ORDER BY created LIMIT 1").fetchone()
+                if row is None:
+                    return None
+                claimed = db.execute(
+                    "UPDATE jobs SET status = 'running', started = ?, owner = ?, lease = ? "
+                    "WHERE id = ? AND status = 'queued'",
+                    (time.time(), owner, lease_until, row[0]),
+                ).rowcount
+                if claimed:
+                    return row[0], json.loads(row[1])
+                # Another process got there first; try the next one
+
+    def renew(self, job_ids, owner, lease_until):
+        with self._connect() as db:
+            db.executemany("UPDATE jobs SET lease = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                           [(lease_until, job_id, owner) for job_id in job_ids])
+
+    def update(self, job_id, **fields):
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as db:
+            db.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?",
+                             (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job['options'] = json.loads(job['options'])
+        return job
+
+    def count_queued(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def recover(self, now):
+        """Requeue running jobs whose owner died or whose lease ran out; returns how many"""
+        with self._connect() as db:
+            owners = [row[0] for row in db.execute(
+                "SELECT DISTINCT owner FROM jobs WHERE status = 'running'")]
+            dead = [owner for owner in owners if owner is None or not process_alive(owner)]
+            requeued = db.execute(
+                "UPDATE jobs SET status = 'queued', started = NULL, owner = NULL, lease = NULL "
+                "WHERE status = 'running' AND (lease IS NULL OR lease < ? OR owner IN "
+                f"({', '.join('?' * len(dead))}))",
+                (now, *dead),
+            ).rowcount
+        return requeued
+
+    def purge(self, before):
+        with self._connect() as db:
+            db.execute('DELETE FROM jobs WHERE finished < ?', (before,))
+
+
+class JobRunner:
+    """Job workers for this process, draining the store shared with every other
+
+    Workers claim the oldest queued job straight from the store. The local
+    queue only wakes one up as soon as this process queues something; jobs
+    queued elsewhere (or left by a recycled worker) are found by polling.
+    """
+
+    def __init__(self, store, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED, ttl=JOB_TTL,
+                 lease=JOB_LEASE, poll_interval=JOB_POLL_INTERVAL):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.wakeups = queue.Queue()
+        self._threads = []
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.completed = 0
+        self.failed = 0
+        self.recovered = 0
+
+    def start(self):
+        """Start the workers on first use, so forked server processes each get their own"""
+        with self._lock:
+            if self._threads:
+                return
+            targets = [(f'watermark-job-{i}', self._work) for i in range(self.workers)]
+            targets.append(('watermark-job-lease', self._renew_leases))
+            for name, target in targets:
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """Let the workers exit once their current job is done"""
+        self._stop.set()
+        for _ in range(self.workers):
+            self.wakeups.put(None)
+
+    def submit(self, options):
+        """Queue a job; returns its id, or None when the queue is full"""
+        self.start()
+        if self.store.count_queued() >= self.max_queued:
+            return None
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, options)
+        self.wakeups.put(job_id)
+        return job_id
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                self.wakeups.get(timeout=self.poll_interval)
+            except queue.Empty:
+                pass
+            recovered = self.store.recover(time.time())
+            with self._lock:
+                self.recovered += recovered
+            while not self._stop.is_set():
+                claimed = self.store.claim_next(os.getpid(), time.time() + self.lease)
+                if claimed is None:
+                    break
+                job_id, options = claimed
+                with self._lock:
+                    self._running.add(job_id)
+                try:
+                    self._run(job_id, options)
+                finally:
+                    with self._lock:
+                        self._running.discard(job_id)
+            self.store.purge(time.time() - self.ttl)
+
+    def _renew_leases(self):
+        while not self._stop.wait(self.lease / 3):
+            with self._lock:
+                running = list(self._running)
+            if running:
+                self.store.renew(running, os.getpid(), time.time() + self.lease)
+
+    def _run(self, job_id, options):
+        image_format = options.get('format', 'jpeg')
+        try:
+            image, hit = cached_clean_frame(
+                options['video_url'], options.get('input', INPUT_MODE), image_format,
+                content_hash=options.get('content_hash'),
+                use_cache=not is_false(options.get('cache', True)),
+                # Already queued and nobody's holding a connection: wait for a slot
+                queue_timeout=None,
+                crop_mode=options.get('crop', CROP_MODE), site=options.get('site'),
+            )
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            self.store.update(job_id, status='failed', finished=time.time(), error=str(e),
+                              error_code=413 if isinstance(e, VideoTooLarge) else 500)
+            return
+
+        with self._lock:
+            self.completed += 1
+        self.store.update(job_id, status='done', finished=time.time(), result=image,
+                          mimetype=IMAGE_FORMATS[image_format][1], cache='HIT' if hit else 'MISS')
+
+    def stats(self):
+        queued = self.store.count_queued()
+        with self._lock:
+            return {
+                'store': self.store.name,
+                'workers': self.workers,
+                'running': bool(self._threads),
+                'queued': queued,
+                'in_progress': len(self._running),
+                'recovered': self.recovered,
+                'completed': self.completed,
+                'failed': self.failed,
+            }
+
+
+job_runner = JobRunner(SQLiteJobStore(JOB_DB) if JOB_DB else MemoryJobStore())
+
+
+@app.before_request
+def start_job_runner():
+    # Every process serving traffic helps drain a shared store, not just the
+    # ones that happened to take a submission
+    job_runner.start()
+
+
+def is_false(value):
+    return str(value).lower() in ('false', '0', 'no', 'off')
+
+
+def validate_options(data):
+    """Return an error message for a bad request/batch item, or None"""
+    if not isinstance(data, dict):
+        return 'request body must be a JSON object'
+    video_url = data.get('video_url')
     if not video_url:
-        return jsonify({'error': 'video_url required'}), 400
+        return 'video_url required'
+    if not isinstance(video_url, str) or not is_http_url(video_url):
+        return 'video_url must be an http(s) URL'
+    if data.get('input', INPUT_MODE) not in INPUT_MODES:
+        return f"input must be one of: {', '.join(INPUT_MODES)}"
+    if data.get('crop', CROP_MODE) not in CROP_MODES:
+        return f"crop must be one of: {', '.join(CROP_MODES)}"
+    site = data.get('site')
+    if site is not None and (not isinstance(site, str) or not 0 < len(site) <= 100 or '/' in site):
+        return 'site must be a short name without slashes'
+    return None
+
+
+def parse_frame_set(data):
+    """Multi-frame options from a request; returns (frame_set or None, error message or None)
+
+    Either "timestamps" (a list, or comma-separated in a query string) or
+    "interval" seconds from "start" for up to "count" frames. "layout" is
+    "frames" (one image each) or "sprite" (one sheet of "tile_width"-wide
+    thumbnails, "columns" across, plus an index of tile offsets).
+    """
+    timestamps, interval = data.get('timestamps'), data.get('interval')
+    if timestamps is None and interval is None:
+        return None, None
+    if Image is None:
+        return None, 'multi-frame output needs Pillow installed on the server'
+
+    try:
+        if timestamps is not None:
+            if isinstance(timestamps, str):
+                timestamps = timestamps.split(',')
+            times = sorted({round(float(at), 3) for at in timestamps})
+            if not times:
+                return None, 'timestamps must not be empty'
+        else:
+            interval, start = float(interval), float(data.get('start', 0))
+            count = min(int(data.get('count', MAX_FRAMES)), MAX_FRAMES)
+            if not math.isfinite(interval) or not math.isfinite(start):
+                return None, 'interval and start must be finite numbers'
+            if interval <= 0 or count < 1:
+                return None, 'interval and count must be positive'
+            times = [round(start + i * interval, 3) for i in range(count)]
+        columns = int(data.get('columns', SPRITE_COLUMNS))
+        tile_width = int(data.get('tile_width', SPRITE_TILE_WIDTH))
+    except (TypeError, ValueError, OverflowError):
+        return None, 'timestamps, interval, start, count, columns and tile_width must be numbers'
+
+    layout = data.get('layout', 'frames')
+    if not all(math.isfinite(at) for at in times):
+        return None, 'timestamps must be finite numbers'
+    if times[0] < 0:
+        return None, 'timestamps must be non-negative'
+    if len(times) > MAX_FRAMES:
+        return None, f'at most {MAX_FRAMES} frames per request'
+    if any(b - a < MIN_FRAME_SPACING for a, b in zip(times, times[1:])):
+        return None, f'timestamps must be at least {MIN_FRAME_SPACING}s apart'
+    if layout not in LAYOUTS:
+        return None, f"layout must be one of: {', '.join(LAYOUTS)}"
+    if layout == 'frames':
+        return {'times': times, 'layout': layout}, None
+    if columns < 1 or not 16 <= tile_width <= 1920:
+        return None, 'columns must be positive and tile_width between 16 and 1920'
+    return {'times': times, 'layout': layout, 'columns': columns, 'tile_width': tile_width}, None
+
+
+def process_batch_item(index, item):
+    """Run one batch item and describe the outcome as a JSON-able dict"""
+    started = time.monotonic()
+    result = {'index': index, 'video_url': item.get('video_url')}
+    error = validate_options(item)
+    image_format = item.get('format', 'jpeg')
+    if error is None and (not isinstance(image_format, str) or image_format not in IMAGE_FORMATS):
+        error = f"format must be one of: {', '.join(IMAGE_FORMATS)}"
+    if error:
+        return {**result, 'success': False, 'error': error}
+
+    try:
+        image, hit = cached_clean_frame(
+            item['video_url'], item.get('input', INPUT_MODE), image_format,
+            content_hash=item.get('content_hash'),
+            use_cache=not is_false(item.get('cache', True)),
+            crop_mode=item.get('crop', CROP_MODE), site=item.get('site'),
+        )
+    except ServerBusy as e:
+        return {**result, 'success': False, 'error': str(e), 'retry_after': RETRY_AFTER}
+    except Exception as e:
+        return {**result, 'success': False, 'error': str(e)}
+
+    _, mimetype = IMAGE_FORMATS[image_format]
+    return {
+        **result,
+        'success': True,
+        'image_url': f'data:{mimetype};base64,{base64.b64encode(image).decode()}',
+        'cache': 'HIT' if hit else 'MISS',
+        'elapsed_ms': round((time.monotonic() - started) * 1000),
+    }
+
+
+def negotiate_format(data):
+    """Pick the response format from ?format=, the JSON body, then the Accept header
+
+    Anything that doesn't explicitly prefer an image type (including */*)
+    gets the original base64 JSON response.
+    """
+    requested = request.args.get('format') or data.get('format')
+    if requested:
+        return requested if isinstance(requested, str) and requested in RESPONSE_FORMATS else None
+    best = request.accept_mimetypes.best_match(
+        ['application/json', 'image/jpeg', 'image/webp'], default='application/json'
+    )
+    return {mimetype: name for name, mimetype in RESPONSE_FORMATS.items()}[best]
+
+
+def image_response(image, mimetype):
+    response = Response(image, mimetype=mimetype)
+    response.headers['Cache-Control'] = IMAGE_CACHE_CONTROL
+    response.vary.add('Accept')
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def download_video(video_url, video_file, max_bytes=MAX_VIDEO_BYTES, deadline=DOWNLOAD_DEADLINE,
+                   queue_timeout=FFMPEG_QUEUE_TIMEOUT):
+    """Stream video_url into a ScratchFile in chunks, enforcing a size cap and overall deadline
+
+    Scratch space is reserved before the first byte is written - the declared
+    length, or one SCRATCH_STEP when there isn't one - and that's the only
+    wait for room, so a download never waits while holding some. Past that
+    the reservation grows a step at a time if there's room right away
+    (ServerBusy if not), and it's trimmed to the real size after.
+    """
+    started = time.monotonic()
+    with http_session().get(video_url, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+        response.raise_for_status()
+
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise VideoTooLarge(f'video is {int(declared)} bytes, limit is {max_bytes}')
+        limit = min(max_bytes, video_file.space.max_bytes)
+        video_file.reserve(int(declared) if declared and declared.isdigit()
+                           else min(SCRATCH_STEP, limit), queue_timeout)
+
+        written = 0
+        with open(video_file.path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise VideoTooLarge(f'video exceeds {max_bytes} bytes')
+                if time.monotonic() - started > deadline:
+                    raise TimeoutError(f'download took longer than {deadline:.0f}s')
+                if written > video_file.reserved:
+                    # Past what we reserved: grow only if there's room now
+                    video_file.reserve(max(written, min(video_file.reserved + SCRATCH_STEP, limit)))
+                f.write(chunk)
+    video_file.trim(written)
+    return written
+
+@app.route('/api/remove-watermark', methods=['GET', 'POST'])
+def remove_watermark():
+    # GET takes the same fields as query parameters, so image responses can
+    # be used directly as <img src> and cached by browsers/CDNs
+    if request.method == 'GET':
+        data = request.args.to_dict()
+    else:
+        data = request.get_json(silent=True) or {}
+    error = validate_options(data)
+    if error:
+        return jsonify({'error': error}), 400
+    video_url = data['video_url']
+    input_mode = data.get('input', INPUT_MODE)
+
+    response_format = negotiate_format(data)
+    if response_format is None:
+        return jsonify({'error': f"format must be one of: {', '.join(RESPONSE_FORMATS)}"}), 400
+    image_format = 'jpeg' if response_format == 'json' else response_format
+
+    frame_set, error = parse_frame_set(data)
+    if error:
+        return jsonify({'error': error}), 400
 
     try:
-        # Create temp files
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as video_file:
-            video_path = video_file.name
-
-        frame_path = video_path.replace('.mp4', '_frame.jpg')
-        clean_path = video_path.replace('.mp4', '_clean.jpg')
-
-        # Download video
-        response = requests.get(video_url)
-        with open(video_path, 'wb') as f:
-            f.write(response.content)
-
-        # Extract frame at 2 seconds using ffmpeg
-        subprocess.run([
-            'ffmpeg', '-i', video_path,
-            '-ss', '2',
-            '-vframes', '1',
-            frame_path
-        ], check=True)
-
-        # Remove watermark (crop bottom 80px) using ImageMagick
-        subprocess.run([
-            'convert', frame_path,
-            '-gravity', 'South',
-            '-chop', '0x80',
-            clean_path
-        ], check=True)
-
-        # Read clean image as base64
-        with open(clean_path, 'rb') as f:
-            image_base64 = base64.b64encode(f.read()).decode()
-
-        # Cleanup
-        os.unlink(video_path)
-        os.unlink(frame_path)
-        os.unlink(clean_path)
+        if frame_set is not None:
+            # Several frames always come back as JSON; "format" picks the image encoding
+            payload, hit = cached_frame_set(
+                video_url, frame_set, input_mode, image_format,
+                content_hash=data.get('content_hash'),
+                use_cache=not is_false(data.get('cache', True)),
+                crop_mode=data.get('crop', CROP_MODE), site=data.get('site'),
+            )
+            response = jsonify(payload)
+            response.vary.add('Accept')
+            response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+            return response
+
+        # 'content_hash' (sha256 of the video) lets re-signed URLs share entries;
+        # 'cache': false forces a fresh extract; 'crop' and 'site' pick the crop profile
+        image, hit = cached_clean_frame(
+            video_url, input_mode, image_format,
+            content_hash=data.get('content_hash'),
+            use_cache=not is_false(data.get('cache', True)),
+            crop_mode=data.get('crop', CROP_MODE), site=data.get('site'),
+        )
 
+        if response_format != 'json':
+            response = image_response(image, RESPONSE_FORMATS[response_format])
+        else:
+            image_base64 = base64.b64encode(image).decode()
+            response = jsonify({
+                'success': True,
+                'image_url': f'data:image/jpeg;base64,{image_base64}'
+            })
+            response.vary.add('Accept')
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    except VideoTooLarge as e:
         return jsonify({
-            'success': True,
-            'image_url': f'data:image/jpeg;base64,{image_base64}'
+            'success': False,
+            'error': str(e)
+        }), 413
+
+    except ServerBusy as e:
+        response = jsonify({
+            'success': False,
+            'error': str(e)
         })
+        response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response, 503
 
     except Exception as e:
         return jsonify({
@@ -69,9 +1938,145 @@ def remove_watermark():
             'error': str(e)
         }), 500
 
+@app.route('/api/remove-watermark/batch', methods=['POST'])
+def remove_watermark_batch():
+    """Clean many videos concurrently, streaming one NDJSON line per item as it finishes
+
+    Body: {"items": [url or {video_url, input, format, content_hash, cache, crop, site}, ...],
+           "defaults": {...options applied to every item}}
+    Each line carries the item's "index" in the request; failures are reported
+    per item and never abort the rest of the batch.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'at most {BATCH_MAX_ITEMS} items per batch'}), 413
+    if not all(isinstance(item, (str, dict)) for item in items):
+        return jsonify({'error': 'items must be video URLs or option objects'}), 400
+
+    defaults = data.get('defaults') or {}
+    if not isinstance(defaults, dict):
+        return jsonify({'error': 'defaults must be an object'}), 400
+    items = [
+        {**defaults, **(item if isinstance(item, dict) else {'video_url': item})}
+        for item in items
+    ]
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(items)))
+        try:
+            futures = [executor.submit(process_batch_item, i, item) for i, item in enumerate(items)]
+            for future in as_completed(futures):
+                yield json.dumps(future.result()) + '\n'
+        finally:
+            # Client went away or we're done: don't start items nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/remove-watermark/jobs', methods=['POST'])
+def submit_job():
+    """Queue a clean-frame job and return its id right away (202)
+
+    Takes the same body as /api/remove-watermark; poll the status_url,
+    then fetch the image from result_url once status is "done".
+    """
+    data = request.get_json(silent=True) or {}
+    error = validate_options(data)
+    if error is None:
+        image_format = data.get('format', 'jpeg')
+        if not isinstance(image_format, str) or image_format not in IMAGE_FORMATS:
+            error = f"format must be one of: {', '.join(IMAGE_FORMATS)}"
+    if error:
+        return jsonify({'error': error}), 400
+
+    options = {key: data[key] for key in ('video_url', 'input', 'format', 'content_hash', 'cache',
+                                          'crop', 'site')
+               if key in data}
+    job_id = job_runner.submit(options)
+    if job_id is None:
+        response = jsonify({'success': False, 'error': 'job queue is full, retry later'})
+        response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response, 503
+
+    status_url = f'/api/remove-watermark/jobs/{job_id}'
+    response = jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': status_url,
+        'result_url': f'{status_url}/result',
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+def job_status(job):
+    status = {key: job[key] for key in ('status', 'created', 'started', 'finished', 'cache', 'error')}
+    return {'job_id': job['id'], **status}
+
+
+@app.route('/api/remove-watermark/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_runner.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'job not found'}), 404
+    response = jsonify(job_status(job))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/remove-watermark/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = job_runner.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'job not found'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'success': False, 'error': job['error']}), job['error_code'] or 500
+    if job['status'] != 'done':
+        response = jsonify(job_status(job))
+        response.headers['Retry-After'] = '2'
+        return response, 202
+
+    response_format = negotiate_format({})
+    if response_format is None:
+        return jsonify({'error': f"format must be one of: {', '.join(RESPONSE_FORMATS)}"}), 400
+    if response_format != 'json':
+        # The image was encoded at submit time; its own type wins over Accept
+        response = image_response(job['result'], job['mimetype'])
+    else:
+        image_base64 = base64.b64encode(job['result']).decode()
+        response = jsonify({
+            'success': True,
+            'image_url': f"data:{job['mimetype']};base64,{image_base64}"
+        })
+        response.vary.add('Accept')
+    response.headers['X-Cache'] = job['cache']
+    return response
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    return jsonify({
+        'status': 'ok',
+        'ffmpeg': ffmpeg_limiter.stats(),
+        'decode': {'backend': ACTIVE_DECODE_BACKEND, **decode_stats()},
+        'http': http_pool_stats(),
+        'cache': result_cache.stats(),
+        'scratch': scratch.stats(),
+        'crop': {'mode': CROP_MODE if AUTO_CROP else 'fixed', **crop_profiles.stats()},
+        'jobs': job_runner.stats(),
+    })
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server only - production runs under gunicorn with
+    # watermark-gunicorn.conf.py (see that file for sizing)
+    app.run(
+        host=os.environ.get('WATERMARK_HOST', '127.0.0.1'),
+        port=int(os.environ.get('WATERMARK_PORT', '5000')),
+        debug=not is_false(os.environ.get('WATERMARK_DEBUG', 'false')),
+    )
@@ -0,0 +1,127 @@
+"""
+Job store tests for serverless-watermark-remover.py
+
+Usage:
+    python -m unittest test_watermark_jobs
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, name):
+    """Import one of the hyphen-named scripts next to this file as a module"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+remover = load_script('serverless-watermark-remover.py', 'watermark_remover')
+
+
+class RecordingRunner(remover.JobRunner):
+    """Runner whose jobs just record themselves, blocking until released"""
+
+    def __init__(self, store, runs, release, **kwargs):
+        super().__init__(store, workers=2, poll_interval=0.05, **kwargs)
+        self.runs = runs
+        self.release = release
+
+    def _run(self, job_id, options):
+        self.runs.append((job_id, self))
+        self.release.wait(10)
+        self.store.update(job_id, status='done', finished=time.time())
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+class SQLiteJobStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        self.store = remover.SQLiteJobStore(self.path)
+        self.runners = []
+
+    def tearDown(self):
+        for runner in self.runners:
+            runner.release.set()
+            runner.stop()
+            for thread in runner._threads:
+                thread.join(5)
+        os.remove(self.path)
+
+    def runner(self, runs, release, **kwargs):
+        runner = RecordingRunner(remover.SQLiteJobStore(self.path), runs, release, **kwargs)
+        self.runners.append(runner)
+        return runner
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                self.fail('timed out')
+            time.sleep(0.02)
+
+    def test_second_runner_leaves_running_job_alone(self):
+        runs, release = [], threading.Event()
+        first = self.runner(runs, release)
+        job_id = first.submit({'video_url': 'http://example.com/a.mp4'})
+        self.wait_for(lambda: runs)
+
+        second = self.runner(runs, release)
+        second.start()
+        time.sleep(0.3)  # several polls and recovery passes
+        self.assertEqual(self.store.get(job_id)['status'], 'running')
+
+        release.set()
+        self.wait_for(lambda: self.store.get(job_id)['status'] == 'done')
+        self.assertEqual(runs, [(job_id, first)])
+
+    def test_idle_runner_picks_up_jobs_queued_elsewhere(self):
+        runs, release = [], threading.Event()
+        release.set()
+        runner = self.runner(runs, release)
+        runner.start()
+        self.store.create('queued-elsewhere', {'video_url': 'http://example.com/a.mp4'})
+        self.wait_for(lambda: self.store.get('queued-elsewhere')['status'] == 'done')
+        self.assertEqual(runs, [('queued-elsewhere', runner)])
+
+    def test_recover_requeues_only_orphaned_jobs(self):
+        now = time.time()
+        for job_id in ('live', 'dead-owner', 'expired'):
+            self.store.create(job_id, {})
+        self.store.claim_next(os.getpid(), now + 60)
+        self.store.claim_next(dead_pid(), now + 60)
+        self.store.claim_next(os.getpid(), now - 1)
+
+        self.assertEqual(self.store.recover(now), 2)
+        self.assertEqual(self.store.get('live')['status'], 'running')
+        self.assertEqual(self.store.get('dead-owner')['status'], 'queued')
+        self.assertEqual(self.store.get('expired')['status'], 'queued')
+
+    def test_lease_is_renewed_while_job_runs(self):
+        runs, release = [], threading.Event()
+        runner = self.runner(runs, release, lease=0.3)
+        job_id = runner.submit({})
+        self.wait_for(lambda: runs)
+        time.sleep(0.6)  # twice the lease
+        self.assertEqual(self.store.recover(time.time()), 0)
+        self.assertEqual(self.store.get(job_id)['status'], 'running')
+
+
+if __name__ == '__main__':
+    unittest.main()
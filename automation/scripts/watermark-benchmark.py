@@ -0,0 +1,190 @@
+"""
+WATERMARK REMOVER BENCHMARKS
+Latency benchmarks for the frame pipeline in serverless-watermark-remover.py
+
+Usage:
+    python watermark-benchmark.py            # run every benchmark
+    python watermark-benchmark.py frame      # run one benchmark
+
+Exits non-zero if a benchmark misses its latency budget.
+"""
+
+import importlib.util
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, name):
+    """Import one of the hyphen-named scripts next to this file as a module"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+service = load_script('serverless-watermark-remover.py', 'watermark_service')
+load_test = load_script('watermark-load-test.py', 'watermark_load_test')
+
+# Decode backends, called directly so the automatic fallback can't blur the numbers
+BACKENDS = {'ffmpeg': service.extract_clean_frame}
+if service.IN_PROCESS_DECODE:
+    BACKENDS['pyav'] = service.pyav_clean_frame
+
+
+def timings(func, repeat=7):
+    """Wall times of `repeat` calls to func in milliseconds, after one warm-up call"""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def cpu_seconds():
+    """CPU used so far by this process plus its finished children (ffmpeg runs)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print("-" * 72)
+    for label, value in rows:
+        print(f"   {label:<34} {value}")
+
+
+class Fixture:
+    """A test clip with a transition right at FRAME_TIME, on disk and over HTTP"""
+
+    def __init__(self):
+        self.scratch = tempfile.mkdtemp(prefix='watermark-bench-')
+        self.path = os.path.join(self.scratch, 'clip.mp4')
+        load_test.make_test_video(self.path, transition_at=service.FRAME_TIME)
+        self.url = f"{load_test.serve_videos(self.scratch)}/clip.mp4"
+
+    def sources(self):
+        return [('local file', self.path), ('http (range)', self.url)]
+
+    def close(self):
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+def frame_score(image):
+    """Score an encoded output image with the service's own sharpness/exposure metric"""
+    stream = service.run_ffmpeg(['-i', 'pipe:0', '-c:v', 'ppm', '-f', 'image2pipe', 'pipe:1'],
+                                input_data=image)
+    frames = [service.ppm_pixels(frame) for frame in service.split_ppm(stream)]
+    return float(service.score_frames(frames)[0])
+
+
+# ---------------------------------------------------------------------------
+# Best-frame selection vs the fixed frame
+# ---------------------------------------------------------------------------
+
+def bench_frame(fixture):
+    if service.np is None:
+        print("\n⚠️  NumPy not installed - best-frame selection is disabled, skipping")
+        return True
+
+    candidates = max(service.FRAME_CANDIDATES, 2)
+    budget = service.FRAME_SELECT_BUDGET_MS
+    extract = BACKENDS[service.ACTIVE_DECODE_BACKEND]
+    rows, within_budget = [], True
+    for label, source in fixture.sources():
+        fixed = timings(lambda: extract(source, candidates=1))
+        best = timings(lambda: extract(source, candidates=candidates))
+        extra = statistics.median(best) - statistics.median(fixed)
+        within_budget &= extra <= budget
+        rows.append((f"{label}: fixed / best p50",
+                     f"{statistics.median(fixed):6.0f} / {statistics.median(best):6.0f} ms"))
+        rows.append((f"{label}: best max (of {len(best)})", f"{max(best):6.0f} ms"))
+        rows.append((f"{label}: added latency",
+                     f"{extra:6.0f} ms  {'✅' if extra <= budget else '❌'} budget {budget:.0f} ms"))
+
+    source = fixture.path
+    rows.append(("frame score, fixed / best",
+                 f"{frame_score(extract(source, candidates=1)):6.2f} / "
+                 f"{frame_score(extract(source, candidates=candidates)):6.2f}"))
+
+    print_table(f"🎯 Best-frame selection, {service.ACTIVE_DECODE_BACKEND} backend ({candidates} "
+                f"candidates over {service.FRAME_WINDOW:g}s, transition at {service.FRAME_TIME:g}s)", rows)
+    return within_budget
+
+
+def bench_score(fixture):
+    if service.np is None:
+        return True
+
+    candidates = max(service.FRAME_CANDIDATES, 2)
+    stream = service.run_ffmpeg(service.input_args(fixture.path, 0) + [
+        '-vf', f'crop=iw:ih-{service.CROP_BOTTOM}:0:0', '-frames:v', str(candidates),
+        '-c:v', 'ppm', '-f', 'image2pipe', 'pipe:1',
+    ])
+    frames = [service.ppm_pixels(frame) for frame in service.split_ppm(stream)]
+    height, width, _ = frames[0].shape
+    split = timings(lambda: service.split_ppm(stream))
+    score = timings(lambda: service.score_frames(frames))
+
+    print_table(f"🧮 Frame scoring ({len(frames)} frames, {width}x{height})", [
+        ("split PPM stream", f"{statistics.median(split):8.2f} ms"),
+        ("score (NumPy, vectorized)", f"{statistics.median(score):8.2f} ms"),
+    ])
+    return True
+
+
+# ---------------------------------------------------------------------------
+# ffmpeg subprocess vs in-process PyAV decoding
+# ---------------------------------------------------------------------------
+
+def bench_backend(fixture, repeat=9):
+    if 'pyav' not in BACKENDS:
+        print("\n⚠️  PyAV/Pillow/NumPy not installed - only the ffmpeg backend is available, skipping")
+        return True
+
+    candidates = max(service.FRAME_CANDIDATES, 2)
+    print("\n⚙️  Decode backends, per request (CPU = this process + ffmpeg children;"
+          " http includes the local video server)")
+    print("-" * 72)
+    print(f"   {'case':<28} {'backend':<8} {'p50 ms':>8} {'max ms':>8} {'CPU ms':>8} {'KB':>7}")
+    for label, source in fixture.sources():
+        for mode, count in (('fixed', 1), (f'best of {candidates}', candidates)):
+            for name, extract in BACKENDS.items():
+                image = extract(source, candidates=count)  # warm-up
+                cpu_before = cpu_seconds()
+                samples = timings(lambda: extract(source, candidates=count), repeat=repeat)
+                cpu = (cpu_seconds() - cpu_before) * 1000 / (repeat + 1)
+                print(f"   {label + ', ' + mode:<28} {name:<8} {statistics.median(samples):>8.0f} "
+                      f"{max(samples):>8.0f} {cpu:>8.0f} {len(image) / 1024:>7.1f}")
+    return True
+
+
+BENCHMARKS = {
+    'frame': bench_frame,
+    'score': bench_score,
+    'backend': bench_backend,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+
+    fixture = Fixture()
+    try:
+        results = [BENCHMARKS[name](fixture) for name in names]
+    finally:
+        fixture.close()
+    sys.exit(0 if all(results) else 1)
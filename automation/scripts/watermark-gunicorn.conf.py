@@ -0,0 +1,55 @@
+"""
+Gunicorn production profile for serverless-watermark-remover.py
+
+    gunicorn -c automation/scripts/watermark-gunicorn.conf.py
+
+Request threads spend nearly all their time waiting - on the network or on
+an ffmpeg child process - so a few worker processes with many threads each
+carry the load, while the ffmpeg limiter keeps the CPU-heavy part to about
+one transcode per core across the whole box.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+CORES = multiprocessing.cpu_count()
+
+# The module name has hyphens; gunicorn imports it with import_module, which
+# is fine with that as long as its directory is the working directory
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'serverless-watermark-remover:app'
+bind = os.environ.get('WATERMARK_BIND', '0.0.0.0:8000')
+
+workers = int(os.environ.get('WATERMARK_WORKERS', str(min(CORES, 4))))
+worker_class = 'gthread'
+threads = int(os.environ.get('WATERMARK_THREADS', '8'))
+
+# Split the ffmpeg cap between the workers (each process has its own limiter)
+os.environ.setdefault('WATERMARK_FFMPEG_CONCURRENCY', str(max(1, CORES // workers)))
+
+# Same for the 1 GB of download scratch space, but leave each worker room for
+# one video of the maximum size plus a first reservation step for each of its
+# other threads, so a big download can't turn every other one away
+os.environ.setdefault('WATERMARK_SCRATCH_MB', str(max(
+    int(os.environ.get('WATERMARK_MAX_VIDEO_MB', '200'))
+    + (threads - 1) * int(os.environ.get('WATERMARK_SCRATCH_STEP_MB', '16')),
+    1024 // workers,
+)))
+
+# In-memory jobs live in one process; with several workers a status poll can
+# land on another one, so keep jobs in the shared SQLite store by default
+os.environ.setdefault('WATERMARK_JOB_DB', os.path.join(tempfile.gettempdir(), 'watermark-jobs.db'))
+
+# gthread workers heartbeat from their main thread, so this only catches a
+# wedged process; individual requests are bounded by the ffmpeg/download timeouts
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks (ffmpeg pipes, fragmentation) can't pile up
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = '-'
+errorlog = '-'
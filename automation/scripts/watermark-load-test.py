@@ -0,0 +1,287 @@
+"""
+WATERMARK REMOVER LOAD TEST
+Fires concurrent /api/remove-watermark requests at the service under different
+serving profiles and reports throughput and latency.
+
+A local Range-capable HTTP server stands in for the video host, so ffmpeg's
+input seeking behaves the way it does against a real CDN.
+
+Usage:
+    python watermark-load-test.py                      # dev vs gunicorn, 200 requests
+    python watermark-load-test.py gunicorn -n 500 -c 32
+    python watermark-load-test.py --url http://host:8000   # an already-running service
+    python watermark-load-test.py gunicorn --input download --no-content-length
+"""
+
+import argparse
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVICE = 'serverless-watermark-remover.py'
+
+# How each profile is started; the port comes in via WATERMARK_PORT / WATERMARK_BIND
+PROFILES = {
+    # What `python serverless-watermark-remover.py` did before: Flask dev server
+    # with the debugger and reloader
+    'dev': ([sys.executable, SERVICE], {'WATERMARK_DEBUG': 'true'}),
+    'gunicorn': ([sys.executable, '-m', 'gunicorn', '-c', 'watermark-gunicorn.conf.py',
+                  '--access-logfile', '/dev/null'], {}),
+}
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static files with single-range support (enough for ffmpeg's HTTP seeking)"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like a real CDN
+
+    def __init__(self, *args, send_length=True, **kwargs):
+        # False: whole-file responses go out without a Content-Length, like a
+        # streaming origin, so downloads can't size their scratch space up front
+        self.send_length = send_length
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2) or end), end)
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size:
+                self.send_error(416)
+                return None
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Accept-Ranges', 'bytes')
+        if self.send_length or match:
+            self.send_header('Content-Length', str(end - start + 1))
+        else:
+            self.send_header('Connection', 'close')  # the body ends when the connection does
+            self.close_connection = True
+        self.end_headers()
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        try:
+            while self.remaining > 0:
+                chunk = source.read(min(256 * 1024, self.remaining))
+                if not chunk:
+                    break
+                outputfile.write(chunk)
+                self.remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg hangs up as soon as it has its frame
+
+
+def serve_videos(directory, send_length=True):
+    """Start the stand-in video host on a free port; returns its base URL"""
+    handler = lambda *args: RangeRequestHandler(*args, directory=directory, send_length=send_length)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def make_test_video(path, seconds=12, transition_at=None):
+    """A 720p H.264 clip with a burned-in caption strip, moov atom up front
+
+    transition_at adds a 0.2s cut to black followed by 0.2s of heavy blur,
+    the kind of frame the best-frame selection is meant to avoid.
+    """
+    filters = ['drawbox=y=ih-80:w=iw:h=80:color=white@0.8:t=fill']
+    if transition_at is not None:
+        t = transition_at
+        filters[:0] = [
+            f"drawbox=color=black:t=fill:enable='between(t,{t - 0.1},{t + 0.1})'",
+            f"boxblur=20:enable='between(t,{t + 0.1},{t + 0.3})'",
+        ]
+    subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=30:duration={seconds}',
+        '-vf', ','.join(filters),
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+        '-movflags', '+faststart', path,
+    ], check=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(profile, scratch):
+    """Launch a profile in its own process group with a cold cache; returns (process, base URL)"""
+    command, env = PROFILES[profile]
+    port = free_port()
+    env = dict(
+        os.environ, **env,
+        WATERMARK_PORT=str(port),
+        WATERMARK_BIND=f'127.0.0.1:{port}',
+        WATERMARK_CACHE_DIR=os.path.join(scratch, f'cache-{profile}'),
+        WATERMARK_JOB_DB=os.path.join(scratch, f'jobs-{profile}.db'),
+    )
+    process = subprocess.Popen(command, cwd=HERE, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'{base_url}/api/health', timeout=1).raise_for_status()
+            return process, base_url
+        except requests.RequestException:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    stop_service(process)
+    raise RuntimeError(f'{profile} profile did not come up on port {port}')
+
+
+def stop_service(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_load(base_url, video_url, total, concurrency, input_mode=None):
+    """POST `total` uncached requests with `concurrency` clients; returns a stats dict"""
+    options = {'format': 'jpeg', 'cache': False}
+    if input_mode:
+        options['input'] = input_mode
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, 'session', None) or requests.Session()
+        local.session = session
+        started = time.perf_counter()
+        try:
+            # A distinct query string per request keeps every one a cache miss
+            response = session.post(f'{base_url}/api/remove-watermark', timeout=120, json={
+                'video_url': f'{video_url}?n={i}', **options,
+            })
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for status, elapsed in results if status == 200)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'ok': len(latencies),
+        'statuses': statuses,
+        'rps': len(latencies) / wall,
+        'p50': percentile(latencies, 0.50) * 1000 if latencies else float('nan'),
+        'p99': percentile(latencies, 0.99) * 1000 if latencies else float('nan'),
+    }
+
+
+def print_results(rows, total, concurrency):
+    print(f"\n📊 {total} uncached requests, {concurrency} concurrent clients, {os.cpu_count()} CPU(s)")
+    print("-" * 72)
+    print(f"   {'profile':<12} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9}   statuses")
+    for label, stats in rows:
+        statuses = ', '.join(f'{k}: {v}' for k, v in sorted(stats['statuses'].items(), key=str))
+        print(f"   {label:<12} {stats['rps']:>8.1f} {stats['p50']:>9.0f} {stats['p99']:>9.0f}   {statuses}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the watermark remover")
+    parser.add_argument('profiles', nargs='*', default=list(PROFILES), metavar='PROFILE',
+                        help=f"profiles to start ({', '.join(PROFILES)})")
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('--video', help="video to serve (default: generate a 12s 720p clip)")
+    parser.add_argument('--url', help="test this running service instead of starting profiles")
+    parser.add_argument('--input', choices=('url', 'download'),
+                        help="input mode to request (default: the service's own)")
+    parser.add_argument('--no-content-length', action='store_true',
+                        help="serve whole-file responses without a Content-Length")
+    args = parser.parse_args(argv)
+    unknown = set(args.profiles) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(sorted(unknown))}")
+
+    if not shutil.which('ffmpeg'):
+        print("❌ ffmpeg not found on PATH")
+        return 1
+
+    scratch = tempfile.mkdtemp(prefix='watermark-load-')
+    try:
+        if args.video:
+            video_dir, video_name = os.path.split(os.path.abspath(args.video))
+        else:
+            video_dir, video_name = scratch, 'clip.mp4'
+            print("🎬 Generating test video...")
+            make_test_video(os.path.join(scratch, video_name))
+        video_url = f'{serve_videos(video_dir, not args.no_content_length)}/{video_name}'
+
+        targets = [('url', args.url)] if args.url else [(p, None) for p in args.profiles]
+        rows = []
+        for label, base_url in targets:
+            process = None
+            if base_url is None:
+                print(f"🚀 Starting {label} profile...")
+                process, base_url = start_service(label, scratch)
+            try:
+                run_load(base_url, video_url, min(args.concurrency, args.requests), args.concurrency,
+                         args.input)  # warm-up
+                print(f"⏱️  Running {args.requests} requests against {label}...")
+                rows.append((label, run_load(base_url, video_url, args.requests, args.concurrency,
+                                             args.input)))
+            finally:
+                if process:
+                    stop_service(process)
+
+        print_results(rows, args.requests, args.concurrency)
+        return 0
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
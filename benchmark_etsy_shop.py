@@ -0,0 +1,258 @@
+"""
+ETSY SHOP BUILD BENCHMARKS
+Micro-benchmarks for the hot spots in etsy_shop_automation.py
+
+Usage:
+    python benchmark_etsy_shop.py            # run every benchmark
+    python benchmark_etsy_shop.py gradient   # run one benchmark
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image, ImageDraw, ImageFont
+
+import etsy_shop_automation as shop
+
+
+def timeit(func, repeat=5):
+    """Return the best wall time of `repeat` calls to func, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    print("-" * 60)
+    for label, value in rows:
+        print(f"   {label:<40} {value}")
+
+
+# ---------------------------------------------------------------------------
+# Mockup 2 background gradient
+# ---------------------------------------------------------------------------
+
+def legacy_gradient():
+    """The original per-row draw.line gradient, kept for comparison"""
+    img = Image.new('RGB', (2000, 2000), color='white')
+    draw = ImageDraw.Draw(img)
+    for i in range(2000):
+        color_val = int(240 - (i / 2000) * 40)
+        draw.line([(0, i), (2000, i)], fill=(color_val, color_val, color_val))
+    return img
+
+
+def bench_gradient():
+    if legacy_gradient().tobytes() != shop.lifestyle_gradient().tobytes():
+        print("⚠️  Cached gradient does not match the legacy pixels")
+
+    shop.lifestyle_gradient.cache_clear()
+    first_build = timeit(shop.lifestyle_gradient, repeat=1)
+    legacy = timeit(legacy_gradient)
+    cached = timeit(lambda: shop.lifestyle_gradient().copy())
+
+    print_table("🎨 Mockup 2 background gradient (per mockup)", [
+        ("legacy draw.line x2000", f"{legacy:8.2f} ms"),
+        ("cached layer, first build (once/run)", f"{first_build:8.2f} ms"),
+        ("cached layer copy", f"{cached:8.2f} ms"),
+        ("speedup", f"{legacy / cached:8.1f}x"),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Mockup fonts
+# ---------------------------------------------------------------------------
+
+MOCKUP_FONT_SIZES = (60, 40, 50, 55, 40, 70)
+
+
+def legacy_fonts():
+    """The original per-mockup truetype loads with a bare fallback"""
+    for size in MOCKUP_FONT_SIZES:
+        try:
+            ImageFont.truetype("arial.ttf", size)
+        except:
+            ImageFont.load_default()
+
+
+def cached_fonts():
+    for size in MOCKUP_FONT_SIZES:
+        shop.get_font(size)
+
+
+def bench_fonts():
+    cached_fonts()  # warm the registry once, as the first product does
+    legacy = timeit(legacy_fonts)
+    cached = timeit(cached_fonts)
+
+    print_table(f"🔤 Mockup font lookups (font: {shop.resolve_font_path() or 'built-in'})", [
+        ("legacy truetype per draw (x6)", f"{legacy:8.3f} ms"),
+        ("font registry (x6)", f"{cached:8.3f} ms"),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Layered mockup compositing
+# ---------------------------------------------------------------------------
+
+def full_redraw(product, mockup_num):
+    """Render base and text from scratch, as every mockup did before layering"""
+    render_base, draw_text = shop.MOCKUP_STYLES[mockup_num]
+    img = render_base(*shop._base_args(product, mockup_num))
+    draw_text(ImageDraw.Draw(img), product)
+    return img
+
+
+def bench_layers():
+    product = shop.PRODUCTS[0]
+    rows = []
+    for mockup_num in shop.MOCKUP_STYLES:
+        shop.render_mockup(product, mockup_num)  # warm the base layer cache
+        full = timeit(lambda: full_redraw(product, mockup_num))
+        layered = timeit(lambda: shop.render_mockup(product, mockup_num))
+        rows.append((f"style {mockup_num}: full redraw / layered",
+                     f"{full:7.2f} / {layered:6.2f} ms ({full / layered:4.1f}x)"))
+
+    print_table("🧱 Mockup render per product (excluding encode)", rows)
+
+
+# ---------------------------------------------------------------------------
+# Mockup encoders
+# ---------------------------------------------------------------------------
+
+def bench_encoders():
+    mockups = [
+        shop.render_mockup(product, mockup_num)
+        for product in shop.PRODUCTS
+        for mockup_num in shop.MOCKUP_STYLES
+    ]
+
+    print(f"\n💾 Mockup encoders ({len(mockups)} real mockups, 2000x2000)")
+    print("-" * 60)
+    print(f"   {'encoder':<12} {'ms/image':>10} {'KB/image':>10} {'total MB':>10}")
+    for name in shop.MOCKUP_ENCODERS:
+        image_format, _, options = shop.MOCKUP_ENCODERS[name]
+        total_bytes = 0
+        start = time.perf_counter()
+        for img in mockups:
+            buffer = io.BytesIO()
+            img.save(buffer, image_format, dpi=(300, 300), **options)
+            total_bytes += buffer.tell()
+        per_image = (time.perf_counter() - start) * 1000 / len(mockups)
+        print(f"   {name:<12} {per_image:>10.1f} {total_bytes / len(mockups) / 1024:>10.1f} "
+              f"{total_bytes / 1024 / 1024:>10.2f}")
+
+
+# ---------------------------------------------------------------------------
+# Shared PDF style registry
+# ---------------------------------------------------------------------------
+
+def measure(func):
+    """Return (seconds, peak bytes allocated) for one call to func"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def build_catalog(shared_styles):
+    for product in shop.PRODUCTS:
+        if not shared_styles:
+            shop.pdf_styles.cache_clear()
+        shop.create_budget_template(product)
+
+
+def bench_styles():
+    shop._require_reportlab()
+    build_registry = shop.pdf_styles.__wrapped__
+    build_registry()  # import/font warm-up
+    registry_seconds, registry_bytes = measure(build_registry)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        os.makedirs("products")
+        try:
+            build_catalog(True)  # warm-up
+            per_product = timeit(lambda: build_catalog(False), repeat=3)
+            shared = timeit(lambda: build_catalog(True), repeat=3)
+        finally:
+            os.chdir(cwd)
+
+    count = len(shop.PRODUCTS)
+    print_table(f"🎨 PDF style registry ({count} products)", [
+        ("style set build (cold)", f"{registry_seconds * 1000:8.2f} ms, {registry_bytes / 1024:7.1f} KB"),
+        (f"saved by sharing (x{count - 1})",
+         f"{registry_seconds * 1000 * (count - 1):8.2f} ms, {registry_bytes * (count - 1) / 1024:7.1f} KB"),
+        ("catalog build, styles per product", f"{per_product:8.1f} ms"),
+        ("catalog build, shared registry", f"{shared:8.1f} ms"),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Form XObject reuse for repeated pages
+# ---------------------------------------------------------------------------
+
+def build_pdfs(products, forms):
+    """Build products in the current directory; return (ms, total bytes)"""
+    start = time.perf_counter()
+    for product in products:
+        shop.create_budget_template(product, forms)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, sum(os.path.getsize(shop.product_pdf_path(p)) for p in products)
+
+
+def bench_forms():
+    planner = next(p for p in shop.PRODUCTS if p['category'] == 'bonus')
+    cases = [
+        (f"catalog ({len(shop.PRODUCTS)} products)", shop.PRODUCTS),
+        ("52-week planner", [dict(planner, pages=53, filename='weekly_52.pdf')]),
+        ("365-day planner", [dict(planner, pages=366, filename='daily_365.pdf')]),
+    ]
+
+    cwd = os.getcwd()
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        os.makedirs("products")
+        try:
+            build_pdfs(shop.PRODUCTS[:1], False)  # warm-up
+            for label, products in cases:
+                plain_ms, plain_bytes = build_pdfs(products, False)
+                forms_ms, forms_bytes = build_pdfs(products, True)
+                rows.append((label, f"{plain_ms:7.0f} -> {forms_ms:6.0f} ms, "
+                                    f"{plain_bytes / 1024:7.1f} -> {forms_bytes / 1024:6.1f} KB"))
+        finally:
+            os.chdir(cwd)
+
+    print_table("📄 Repeated pages as form XObjects (plain -> forms)", rows)
+
+
+BENCHMARKS = {
+    'gradient': bench_gradient,
+    'fonts': bench_fonts,
+    'layers': bench_layers,
+    'encoders': bench_encoders,
+    'styles': bench_styles,
+    'forms': bench_forms,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+        BENCHMARKS[name]()
@@ -1,11 +1,44 @@
 #!/usr/bin/env python3
 """
 Extract a frame from hero-video.mp4 to create hero-poster.jpg
+
+Rather than trusting the frame at exactly 0.5s (often mid-fade or motion
+blurred), a handful of candidates around it are decoded in one pass and the
+sharpest, best-exposed one becomes the poster.
 """
 
+import importlib.util
 import sys
 import os
 
+POSTER_TIME = 0.5  # seconds
+CANDIDATES = 8
+WINDOW = 1.0  # seconds of video sampled around POSTER_TIME
+
+
+def candidate_times():
+    start = max(0.0, POSTER_TIME - WINDOW / 2)
+    return [start + WINDOW * i / CANDIDATES for i in range(CANDIDATES)]
+
+
+def load_frame_scoring():
+    """The watermark remover's frame scoring (automation/scripts/frame_scoring.py),
+    so posters and cleaned frames pick the same way"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'automation', 'scripts', 'frame_scoring.py')
+    spec = importlib.util.spec_from_file_location('frame_scoring', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+try:
+    # Scores same-sized RGB (or OpenCV BGR) frames; the highest is the best poster
+    score_frames = load_frame_scoring().score_frames
+except ImportError:  # no NumPy means no OpenCV or moviepy either, reported below
+    score_frames = None
+
+
 try:
     import cv2
     print("Using OpenCV for frame extraction...")
@@ -20,21 +53,29 @@ try:
         print(f"Error: Could not open video file: {video_path}")
         sys.exit(1)
 
-    # Get FPS and calculate frame number for 0.5 seconds
+    # Seek once to the first candidate, then read forward through the window
     fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_number = int(fps * 0.5)  # 0.5 seconds in
-
-    # Set position to frame
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-
-    # Read frame
-    ret, frame = cap.read()
+    wanted = sorted({int(round(fps * t)) for t in candidate_times()})
+    cap.set(cv2.CAP_PROP_POS_FRAMES, wanted[0])
+
+    frames = {}
+    for frame_number in range(wanted[0], wanted[-1] + 1):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_number in wanted:
+            frames[frame_number] = frame
+
+    if frames:
+        numbers = list(frames)
+        scores = score_frames([frames[n] for n in numbers], bgr=True)
+        frame_number = numbers[int(scores.argmax())]
+        frame = frames[frame_number]
 
-    if ret:
         # Save frame as JPEG with high quality
         cv2.imwrite(output_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
         print(f"SUCCESS: Poster created successfully: {output_path}")
-        print(f"  Frame: {frame_number} (0.5 seconds)")
+        print(f"  Frame: {frame_number} ({frame_number / fps:.2f} seconds, best of {len(frames)})")
         print(f"  Size: {frame.shape[1]}x{frame.shape[0]}")
     else:
         print("Error: Could not read frame from video")
@@ -54,16 +95,18 @@ except ImportError:
         # Load video
         clip = VideoFileClip(video_path)
 
-        # Extract frame at 0.5 seconds
-        frame = clip.get_frame(0.5)
+        # Candidate times increase, so the reader decodes forward in one pass
+        times = [t for t in candidate_times() if t < clip.duration]
+        frames = [clip.get_frame(t) for t in times]
+        best = int(score_frames(frames).argmax())
 
         # Save frame
         from PIL import Image
-        img = Image.fromarray(frame)
+        img = Image.fromarray(frames[best])
         img.save(output_path, quality=95)
 
         print(f"SUCCESS: Poster created successfully: {output_path}")
-        print(f"  Time: 0.5 seconds")
+        print(f"  Time: {times[best]:.2f} seconds (best of {len(frames)})")
         print(f"  Size: {img.size[0]}x{img.size[1]}")
 
         clip.close()
@@ -79,6 +122,6 @@ except ImportError:
         print("")
         print("Alternatively, create the poster manually:")
         print("1. Open public/hero-video.mp4 in any video player")
-        print("2. Pause at 0.5 seconds (a good representative frame)")
+        print("2. Pause near 0.5 seconds on a sharp, well-lit frame")
         print("3. Take a screenshot and save as public/hero-poster.jpg")
         sys.exit(1)
@@ -1167,8 +1167,12 @@ def create_listing(page, product):
         
         # Upload mockup images
         try:
-            mockup_pattern = product['filename'].replace('products/', 'mockups/').replace('.pdf', '_mockup_*.png')
-            mockup_files = glob.glob(mockup_pattern)
+            mockup_pattern = product['filename'].replace('products/', 'mockups/').replace('.pdf', '_mockup_*.*')
+            # One file per mockup - if several encodings exist, the newest wins
+            latest = {}
+            for path in sorted(glob.glob(mockup_pattern), key=os.path.getmtime):
+                latest[os.path.splitext(path)[0]] = path
+            mockup_files = sorted(latest.values())
             
             if mockup_files:
                 image_input = page.locator('input[type="file"][accept*="image"]').first
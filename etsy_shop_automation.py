@@ -1,29 +1,104 @@
 """
 AUTONOMOUS ETSY SHOP BUILDER
 Creates 25-30 digital products, mockups, and lists them on Etsy
+
+Run as a script to build everything (see --help), or import it as a library:
+
+    from etsy_shop_automation import PRODUCTS, create_budget_template, create_mockup_image
+    create_budget_template(PRODUCTS[0])
+
+Importing has no side effects. reportlab and PIL are only loaded when a PDF
+or mockup is first built, so CLI help and manifest-only work start quickly.
 """
 
 import os
 import sys
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.lib import colors
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import inspect
+import json
+import threading
+from collections import namedtuple
+from functools import lru_cache, partial
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import time
-from datetime import datetime
 
-# Create directories
-os.makedirs("products", exist_ok=True)
-os.makedirs("mockups", exist_ok=True)
+__all__ = [
+    'PRODUCTS', 'PAGE_BUILDERS', 'MOCKUP_STYLES', 'MOCKUP_ENCODERS',
+    'create_budget_template', 'create_mockup_image', 'create_mockup_images',
+    'render_mockup', 'save_mockup', 'repeated_form', 'build_products', 'build_mockups',
+    'run_mockup_pipeline', 'load_manifest', 'save_manifest', 'main',
+]
+
+# Heavy dependencies, bound on first use by _require_reportlab() / _require_pil()
+letter = inch = colors = None
+SimpleDocTemplate = Table = TableStyle = Paragraph = Spacer = PageBreak = None
+getSampleStyleSheet = ParagraphStyle = TA_CENTER = None
+Image = ImageDraw = ImageFont = None
+
+
+def _require_reportlab():
+    """Import reportlab into module globals the first time a PDF is built"""
+    global letter, inch, colors, SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    global getSampleStyleSheet, ParagraphStyle, TA_CENTER
+    if SimpleDocTemplate is not None:
+        return
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib import colors
+
 
-print("🚀 Starting Etsy Shop Automation...")
-print("\n" + "="*60)
-print("📁 PHASE 1: CREATING PRODUCTS")
-print("="*60 + "\n")
+def _require_pil():
+    """Import PIL into module globals the first time a mockup is drawn or saved"""
+    global Image, ImageDraw, ImageFont
+    if Image is not None:
+        return
+    from PIL import Image, ImageDraw, ImageFont
+
+# Build manifest used to skip products whose inputs and outputs are unchanged
+MANIFEST_PATH = ".build_manifest.json"
+
+# Product fields each output actually depends on - editing anything else
+# (e.g. a price) must not rebuild it
+PDF_FIELDS = ('name', 'filename', 'category', 'pages', 'description', 'features')
+MOCKUP_FIELDS = {
+    1: ('name', 'filename'),
+    2: ('name', 'filename'),
+    3: ('name', 'filename', 'features', 'price'),
+}
+
+# Mockup pipeline memory: a 2000x2000 RGB mockup is held as raw bytes and as
+# an Image while it waits for the encoder
+MOCKUP_MEMORY_MB = 512
+MOCKUP_INFLIGHT_BYTES = 2 * 2000 * 2000 * 3
+
+# Mockup output encoders: (Pillow format, file extension, save options).
+# 'png' matches Pillow's defaults; the others trade size against encode time.
+MOCKUP_ENCODERS = {
+    'png': ('PNG', 'png', {'compress_level': 6}),
+    'png-fast': ('PNG', 'png', {'compress_level': 1}),
+    'png-small': ('PNG', 'png', {'optimize': True}),
+    'webp': ('WEBP', 'webp', {'lossless': True, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 92, 'subsampling': 0}),
+    'jpeg-small': ('JPEG', 'jpg', {'quality': 82, 'optimize': True}),
+}
+DEFAULT_MOCKUP_ENCODER = 'png'
+
+# Fonts tried in order for mockup text; the first one that loads is used for
+# every size, falling back to Pillow's built-in font when none are installed
+FONT_CANDIDATES = (
+    "arial.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
 
 # Product definitions
 PRODUCTS = [
@@ -489,32 +564,185 @@ PRODUCTS = [
 ]
 
 
-def create_budget_template(product):
-    """Create a professional budget template PDF"""
-    filename = f"products/{product['filename']}"
-    doc = SimpleDocTemplate(filename, pagesize=letter)
-    story = []
-    styles = getSampleStyleSheet()
+def product_pdf_path(product):
+    return f"products/{product['filename']}"
+
+
+def mockup_path(product, mockup_num, encoder=DEFAULT_MOCKUP_ENCODER):
+    extension = MOCKUP_ENCODERS[encoder][1]
+    return f"mockups/{product['filename'].replace('.pdf', '')}_mockup_{mockup_num}.{extension}"
+
+
+PdfStyles = namedtuple('PdfStyles', ['sheet', 'title', 'heading', 'tables'])
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """Paragraph and table styles shared by every product PDF, built once per process
+
+    Treat the result as read-only: Table.setStyle() and Paragraph only read
+    from these, so one set serves every page of every product.
+    """
+    _require_reportlab()
+    sheet = getSampleStyleSheet()
     
     # Custom styles
-    title_style = ParagraphStyle(
+    title = ParagraphStyle(
         'CustomTitle',
-        parent=styles['Heading1'],
+        parent=sheet['Heading1'],
         fontSize=24,
         textColor=colors.HexColor('#2C3E50'),
         spaceAfter=30,
         alignment=TA_CENTER
     )
     
-    heading_style = ParagraphStyle(
+    heading = ParagraphStyle(
         'CustomHeading',
-        parent=styles['Heading2'],
+        parent=sheet['Heading2'],
         fontSize=16,
         textColor=colors.HexColor('#34495E'),
         spaceAfter=12,
         spaceBefore=12
     )
     
+    tables = {
+        'income': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]),
+        'expense': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 14),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ]),
+        'tracking': TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'bundle': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9B59B6')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'meal': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#D5F4E6')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'grocery': TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'social': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8E44AD')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 18),
+            ('GRID', (0, 0), (-1, -1), 2, colors.HexColor('#8E44AD')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F4ECF7')]),
+        ]),
+        'bonus': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16A085')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ]),
+    }
+    return PdfStyles(sheet, title, heading, MappingProxyType(tables))
+
+
+# Bleed around a form XObject's bounding box so grid lines on its edges and
+# cell text that overflows the table are not clipped
+FORM_PADDING = 72
+
+
+@lru_cache(maxsize=None)
+def _repeated_form_type():
+    """Flowable class for repeated page bodies, defined once reportlab is loaded"""
+    _require_reportlab()
+    from reportlab.platypus import Flowable
+
+    class RepeatedForm(Flowable):
+        """Draws its body once per document as a PDF form XObject, then references it"""
+
+        def __init__(self, name, body):
+            Flowable.__init__(self)
+            self.name = name
+            self.body = body
+            self.hAlign = getattr(body, 'hAlign', self.hAlign)
+
+        def getSpaceBefore(self):
+            return self.body.getSpaceBefore()
+
+        def getSpaceAfter(self):
+            return self.body.getSpaceAfter()
+
+        def wrap(self, availWidth, availHeight):
+            self.width, self.height = self.body.wrap(availWidth, availHeight)
+            return self.width, self.height
+
+        def draw(self):
+            canv = self.canv
+            if not canv.hasForm(self.name):
+                canv.beginForm(self.name, -FORM_PADDING, -FORM_PADDING,
+                               self.width + FORM_PADDING, self.height + FORM_PADDING)
+                self.body.drawOn(canv, 0, 0)
+                canv.endForm()
+            canv.doForm(self.name)
+
+    return RepeatedForm
+
+
+def repeated_form(name, body, forms):
+    """Return `body` for the story, wrapped as a reusable form XObject when forms=True
+
+    The same body may be passed for every repeated page; its drawing
+    operators are then written to the PDF once instead of once per page.
+    """
+    if not forms:
+        return body
+    return _repeated_form_type()(name, body)
+
+
+def create_budget_template(product, forms=False):
+    """Create a professional budget template PDF
+
+    With forms=True, identical tracking grids are drawn once per PDF and
+    referenced on each page (see repeated_form()).
+    """
+    _require_reportlab()
+    filename = product_pdf_path(product)
+    doc = SimpleDocTemplate(filename, pagesize=letter)
+    story = []
+    registry = pdf_styles()
+    styles = registry.sheet
+    title_style = registry.title
+    heading_style = registry.heading
+    
     # Title page
     story.append(Spacer(1, 1*inch))
     story.append(Paragraph(product['name'], title_style))
@@ -531,22 +759,14 @@ def create_budget_template(product):
     story.append(PageBreak())
     
     # Create template pages based on category
-    if product['category'] == 'budget':
-        create_budget_pages(story, styles, heading_style, product)
-    elif product['category'] == 'bundle':
-        create_bundle_pages(story, styles, heading_style, product)
-    elif product['category'] == 'meal':
-        create_meal_pages(story, styles, heading_style, product)
-    elif product['category'] == 'social':
-        create_social_pages(story, styles, heading_style, product)
-    elif product['category'] == 'bonus':
-        create_bonus_pages(story, styles, heading_style, product)
+    page_builder = PAGE_BUILDERS.get(product['category'])
+    if page_builder:
+        page_builder(story, styles, heading_style, product, forms)
     
     doc.build(story)
-    print(f"✅ Created: {product['name']}")
 
 
-def create_budget_pages(story, styles, heading_style, product):
+def create_budget_pages(story, styles, heading_style, product, forms=False):
     """Create budget-specific template pages"""
     # Monthly Budget Table
     story.append(Paragraph("MONTHLY BUDGET WORKSHEET", heading_style))
@@ -561,16 +781,7 @@ def create_budget_pages(story, styles, heading_style, product):
     ]
     
     income_table = Table(income_data, colWidths=[3*inch, 3*inch])
-    income_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    income_table.setStyle(pdf_styles().tables['income'])
     
     story.append(income_table)
     story.append(Spacer(1, 0.3*inch))
@@ -591,42 +802,31 @@ def create_budget_pages(story, styles, heading_style, product):
     ]
     
     expense_table = Table(expense_data, colWidths=[2*inch, 2*inch, 2*inch])
-    expense_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
-    ]))
+    expense_table.setStyle(pdf_styles().tables['expense'])
     
     story.append(expense_table)
     story.append(PageBreak())
     
     # Additional tracking pages
+    tracking_table = None
     for i in range(product['pages'] - 2):
         story.append(Paragraph(f"{product['name']} - Page {i+1}", heading_style))
         story.append(Spacer(1, 0.2*inch))
         
-        tracking_data = []
-        for j in range(15):
-            tracking_data.append(['_'*40, '_'*20])
-        
-        tracking_table = Table(tracking_data, colWidths=[4*inch, 2*inch])
-        tracking_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        if tracking_table is None or not forms:
+            tracking_data = []
+            for j in range(15):
+                tracking_data.append(['_'*40, '_'*20])
+            
+            tracking_table = Table(tracking_data, colWidths=[4*inch, 2*inch])
+            tracking_table.setStyle(pdf_styles().tables['tracking'])
         
-        story.append(tracking_table)
+        story.append(repeated_form('BudgetTracking', tracking_table, forms))
         if i < product['pages'] - 3:
             story.append(PageBreak())
 
 
-def create_bundle_pages(story, styles, heading_style, product):
+def create_bundle_pages(story, styles, heading_style, product, forms=False):
     """Create bundle pages - combination of included templates"""
     story.append(Paragraph("BUNDLE CONTENTS", heading_style))
     story.append(Paragraph("This bundle includes the following templates:", styles['Normal']))
@@ -639,31 +839,26 @@ def create_bundle_pages(story, styles, heading_style, product):
     story.append(PageBreak())
     
     # Add sample pages from each included template
+    table = None
     for i in range(product['pages'] - 2):
         story.append(Paragraph(f"Template Section {i+1}", heading_style))
         story.append(Spacer(1, 0.2*inch))
         
-        # Sample table
-        data = [['Category', 'Amount', 'Notes']]
-        for j in range(12):
-            data.append(['_'*20, '_'*15, '_'*25])
-        
-        table = Table(data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9B59B6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        if table is None or not forms:
+            # Sample table
+            data = [['Category', 'Amount', 'Notes']]
+            for j in range(12):
+                data.append(['_'*20, '_'*15, '_'*25])
+            
+            table = Table(data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
+            table.setStyle(pdf_styles().tables['bundle'])
         
-        story.append(table)
+        story.append(repeated_form('BundleSection', table, forms))
         if i < product['pages'] - 3:
             story.append(PageBreak())
 
 
-def create_meal_pages(story, styles, heading_style, product):
+def create_meal_pages(story, styles, heading_style, product, forms=False):
     """Create meal planning template pages"""
     # Weekly meal planner
     story.append(Paragraph("WEEKLY MEAL PLANNER", heading_style))
@@ -677,15 +872,7 @@ def create_meal_pages(story, styles, heading_style, product):
         data.append([day] + ['_'*12] * len(meals))
     
     table = Table(data, colWidths=[1.2*inch, 1.2*inch, 1.2*inch, 1.2*inch, 1.2*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('BACKGROUND', (0, 1), (0, -1), colors.HexColor('#D5F4E6')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
+    table.setStyle(pdf_styles().tables['meal'])
     
     story.append(table)
     story.append(PageBreak())
@@ -703,10 +890,7 @@ def create_meal_pages(story, styles, heading_style, product):
             grocery_data.append(['☐', '_'*40, '_'*10])
         
         grocery_table = Table(grocery_data, colWidths=[0.3*inch, 4*inch, 1.5*inch])
-        grocery_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        grocery_table.setStyle(pdf_styles().tables['grocery'])
         story.append(grocery_table)
         story.append(Spacer(1, 0.2*inch))
         
@@ -714,7 +898,7 @@ def create_meal_pages(story, styles, heading_style, product):
             story.append(Spacer(1, 0.1*inch))
 
 
-def create_social_pages(story, styles, heading_style, product):
+def create_social_pages(story, styles, heading_style, product, forms=False):
     """Create social media template guide pages"""
     story.append(Paragraph("SOCIAL MEDIA TEMPLATES GUIDE", heading_style))
     story.append(Spacer(1, 0.2*inch))
@@ -730,43 +914,37 @@ def create_social_pages(story, styles, heading_style, product):
     story.append(PageBreak())
     
     # Template showcase pages
+    design_table = None
     for i in range(product['pages'] - 2):
         story.append(Paragraph(f"Template Design {i+1}", heading_style))
         story.append(Spacer(1, 0.3*inch))
         
-        # Create a visual representation
-        design_data = [
-            ['TEMPLATE DESIGN PREVIEW', ''],
-            ['', ''],
-            ['Your Text Here', ''],
-            ['', ''],
-            ['Edit and customize', ''],
-            ['', ''],
-        ]
-        
-        design_table = Table(design_data, colWidths=[3*inch, 3*inch])
-        design_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8E44AD')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 18),
-            ('GRID', (0, 0), (-1, -1), 2, colors.HexColor('#8E44AD')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F4ECF7')]),
-        ]))
+        if design_table is None or not forms:
+            # Create a visual representation
+            design_data = [
+                ['TEMPLATE DESIGN PREVIEW', ''],
+                ['', ''],
+                ['Your Text Here', ''],
+                ['', ''],
+                ['Edit and customize', ''],
+                ['', ''],
+            ]
+            
+            design_table = Table(design_data, colWidths=[3*inch, 3*inch])
+            design_table.setStyle(pdf_styles().tables['social'])
         
-        story.append(design_table)
+        story.append(repeated_form('SocialDesign', design_table, forms))
         if i < product['pages'] - 3:
             story.append(PageBreak())
 
 
-def create_bonus_pages(story, styles, heading_style, product):
+def create_bonus_pages(story, styles, heading_style, product, forms=False):
     """Create bonus template pages"""
     story.append(Paragraph(f"{product['name'].upper()}", heading_style))
     story.append(Spacer(1, 0.2*inch))
     
     # Create tracking grids
+    table = None
     for i in range(product['pages'] - 1):
         if i > 0:
             story.append(PageBreak())
@@ -774,39 +952,387 @@ def create_bonus_pages(story, styles, heading_style, product):
         story.append(Paragraph(f"Tracking Page {i+1}", styles['Heading3']))
         story.append(Spacer(1, 0.2*inch))
         
-        # Create a grid for tracking
-        data = [['Date', 'Item/Goal', 'Progress', 'Notes']]
-        for j in range(20):
-            data.append(['_'*10, '_'*20, '_'*10, '_'*25])
-        
-        table = Table(data, colWidths=[1*inch, 2*inch, 1*inch, 2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#16A085')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ]))
+        if table is None or not forms:
+            # Create a grid for tracking
+            data = [['Date', 'Item/Goal', 'Progress', 'Notes']]
+            for j in range(20):
+                data.append(['_'*10, '_'*20, '_'*10, '_'*25])
+            
+            table = Table(data, colWidths=[1*inch, 2*inch, 1*inch, 2*inch])
+            table.setStyle(pdf_styles().tables['bonus'])
         
-        story.append(table)
+        story.append(repeated_form('BonusTracking', table, forms))
+
+
+PAGE_BUILDERS = {
+    'budget': create_budget_pages,
+    'bundle': create_bundle_pages,
+    'meal': create_meal_pages,
+    'social': create_social_pages,
+    'bonus': create_bonus_pages,
+}
+
+
+# ---------------------------------------------------------------------------
+# Incremental builds
+# ---------------------------------------------------------------------------
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the build manifest, or an empty one if missing/corrupt"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _input_digest(product, fields, generators, settings=None):
+    """Hash the product fields an output uses plus the source of the code that renders it"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({f: product.get(f) for f in fields}, sort_keys=True).encode())
+    for func in generators:
+        digest.update(inspect.getsource(func).encode())
+    if settings is not None:
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def pdf_input_digest(product, forms=False):
+    generators = [create_budget_template, pdf_styles]
+    if product['category'] in PAGE_BUILDERS:
+        generators.append(PAGE_BUILDERS[product['category']])
+    if forms:
+        generators += [repeated_form, _repeated_form_type]
+    return _input_digest(product, PDF_FIELDS, generators, {'forms': forms})
+
+
+def mockup_input_digest(product, mockup_num, encoder=DEFAULT_MOCKUP_ENCODER):
+    render_base, draw_text = MOCKUP_STYLES[mockup_num]
+    generators = [create_mockup_image, render_mockup, mockup_base, render_base, draw_text, get_font]
+    if mockup_num == 2:
+        generators.append(lifestyle_gradient)
+    return _input_digest(
+        product, MOCKUP_FIELDS[mockup_num], generators,
+        {'font': resolve_font_path(), 'encoder': MOCKUP_ENCODERS[encoder]},
+    )
+
+
+def is_up_to_date(manifest, output, input_digest):
+    """True when `output` was built from `input_digest` and hasn't changed since"""
+    entry = manifest.get(output)
+    return (
+        entry is not None
+        and entry['input'] == input_digest
+        and os.path.exists(output)
+        and _file_digest(output) == entry['output']
+    )
 
 
-# Generate all products
-for product in PRODUCTS:
+def record_build(manifest, output, input_digest, generator):
+    manifest[output] = {
+        'input': input_digest,
+        'generator': generator,
+        'output': _file_digest(output),
+    }
+
+
+def _build_product(product, forms=False):
+    """Build one product PDF and report (success, seconds, error) - runs in pool workers"""
+    start = time.perf_counter()
     try:
-        create_budget_template(product)
+        create_budget_template(product, forms)
+        return True, time.perf_counter() - start, None
     except Exception as e:
-        print(f"⚠️  Error creating {product['name']}: {str(e)}")
-        continue
+        return False, time.perf_counter() - start, str(e)
+
+
+def _report_product(product, ok, seconds, error):
+    if ok:
+        print(f"✅ Created: {product['name']} ({seconds:.2f}s)")
+    else:
+        print(f"⚠️  Error creating {product['name']}: {error}")
+
+
+def build_products(jobs=1, manifest=None, force=False, forms=False):
+    """Build all product PDFs, across `jobs` worker processes when jobs > 1
+
+    With a manifest, products whose inputs and PDF are unchanged since the
+    last build are skipped unless `force` is set.
+    """
+    start = time.perf_counter()
+    results = []
+
+    digests = {product['id']: pdf_input_digest(product, forms) for product in PRODUCTS}
+    pending = PRODUCTS
+    if manifest is not None and not force:
+        pending = [
+            product for product in PRODUCTS
+            if not is_up_to_date(manifest, product_pdf_path(product), digests[product['id']])
+        ]
+    skipped = len(PRODUCTS) - len(pending)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map() yields in PRODUCTS order, so the log stays stable
+            outcomes = pool.map(partial(_build_product, forms=forms), pending)
+            for product, outcome in zip(pending, outcomes):
+                results.append((product,) + outcome)
+                _report_product(*results[-1])
+    else:
+        for product in pending:
+            results.append((product,) + _build_product(product, forms))
+            _report_product(*results[-1])
+
+    if manifest is not None:
+        for product, ok, _, _ in results:
+            if ok:
+                record_build(manifest, product_pdf_path(product), digests[product['id']],
+                             'create_budget_template')
+
+    elapsed = time.perf_counter() - start
+    built = [r for r in results if r[1]]
+    failed = [r for r in results if not r[1]]
+    cpu_time = sum(r[2] for r in results)
+
+    if pending:
+        print(f"\n✅ {len(built)}/{len(pending)} products created in {elapsed:.2f}s "
+              f"({cpu_time:.2f}s build time, {jobs} job{'s' if jobs > 1 else ''})")
+    else:
+        print("\n✅ All products up to date")
+    if skipped:
+        print(f"⏭️  {skipped} unchanged products skipped")
+    if failed:
+        print(f"⚠️  {len(failed)} failed:")
+        for product, _, _, error in failed:
+            print(f"   • {product['name']}: {error}")
+    print(f"📦 Products saved in: {os.path.abspath('products')}")
+    return results
+
+
+@lru_cache(maxsize=None)
+def resolve_font_path():
+    """Return the first loadable entry of FONT_CANDIDATES, or None (also cached)"""
+    _require_pil()
+    for path in FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(path, 12)
+            return path
+        except OSError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font(path, size):
+    """Memoized font registry keyed by (font path, size)"""
+    _require_pil()
+    if path is not None:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default()
+
+
+def get_font(size):
+    """Mockup font at `size` px - shared by every mockup style"""
+    return load_font(resolve_font_path(), size)
+
+
+@lru_cache(maxsize=None)
+def lifestyle_gradient(size=2000):
+    """Vertical grey gradient (240 -> 200) behind mockup 2, built once per process
+
+    Builds a single 1px column and stretches it, instead of drawing one
+    line per row for every product. Callers must copy() before drawing.
+    """
+    _require_pil()
+    column = Image.new('L', (1, size))
+    column.putdata([int(240 - (i / size) * 40) for i in range(size)])
+    return column.resize((size, size), Image.NEAREST).convert('RGB')
+
+
+def _mockup_1_base():
+    """Mockup 1: Clean product preview - border, title bar, content rows, footer"""
+    img = Image.new('RGB', (2000, 2000), color='white')
+    draw = ImageDraw.Draw(img)
+    
+    # Add border
+    draw.rectangle([100, 100, 1900, 1900], outline='#E0E0E0', width=5)
+    
+    # Title area
+    draw.rectangle([100, 100, 1900, 400], fill='#3498DB')
+    
+    # Content area - simulate template preview
+    y_pos = 500
+    for i in range(6):
+        draw.rectangle([200, y_pos, 1800, y_pos + 80], outline='#BDC3C7', width=2)
+        y_pos += 120
+    
+    # Footer
+    draw.rectangle([100, 1700, 1900, 1900], fill='#2C3E50')
+    footer_font = get_font(40)
+    draw.text((1000, 1800), 'INSTANT DOWNLOAD • PDF', fill='white', font=footer_font, anchor='mm')
+    return img
+
+
+def _mockup_1_text(draw, product):
+    font = get_font(60)
+    
+    # Draw product name
+    text = product['name']
+    # Wrap text if too long
+    if len(text) > 30:
+        words = text.split()
+        line1 = ' '.join(words[:len(words)//2])
+        line2 = ' '.join(words[len(words)//2:])
+        draw.text((1000, 200), line1, fill='white', font=font, anchor='mm')
+        draw.text((1000, 280), line2, fill='white', font=font, anchor='mm')
+    else:
+        draw.text((1000, 250), text, fill='white', font=font, anchor='mm')
+
+
+def _mockup_2_base():
+    """Mockup 2: Lifestyle/desk scene - gradient, desk, paper, coffee cup"""
+    # Background gradient effect
+    img = lifestyle_gradient().copy()
+    draw = ImageDraw.Draw(img)
+    
+    # Desk surface
+    draw.rectangle([0, 1200, 2000, 2000], fill='#D7CCC8')
+    
+    # Paper/template mockup
+    draw.rectangle([400, 600, 1600, 1700], fill='white', outline='#757575', width=3)
+    
+    # Template content
+    draw.rectangle([500, 700, 1500, 850], fill='#3498DB')
+    
+    # Lines representing content
+    for i in range(5):
+        y = 950 + i * 100
+        draw.line([(550, y), (1450, y)], fill='#BDBDBD', width=3)
+    
+    # Coffee cup decoration
+    draw.ellipse([1650, 1400, 1850, 1600], fill='#6D4C41', outline='#4E342E', width=3)
+    return img
+
+
+def _mockup_2_text(draw, product):
+    title_font = get_font(50)
+    draw.text((1000, 775), product['name'][:25], fill='white', font=title_font, anchor='mm')
 
-print(f"\n✅ All {len(PRODUCTS)} products created!")
-print(f"📦 Products saved in: {os.path.abspath('products')}")
 
-print("\n" + "="*60)
-print("🖼️  PHASE 2: GENERATING MOCKUPS")
-print("="*60 + "\n")
+def _mockup_3_base(feature_count):
+    """Mockup 3: Features highlighted - card, header, checkmarks, price badge"""
+    # Background
+    img = Image.new('RGB', (2000, 2000), color='#ECF0F1')
+    draw = ImageDraw.Draw(img)
+    
+    # Main product card
+    draw.rectangle([300, 200, 1700, 1800], fill='white', outline='#95A5A6', width=5)
+    
+    # Header
+    draw.rectangle([300, 200, 1700, 450], fill='#E74C3C')
+    
+    # Checkmark circles, one per feature row
+    feature_font = get_font(40)
+    y_pos = 550
+    for idx in range(feature_count):
+        draw.ellipse([370, y_pos-15, 420, y_pos+35], fill='#27AE60')
+        draw.text((395, y_pos+10), '✓', fill='white', font=feature_font, anchor='mm')
+        y_pos += 150
+    
+    # Price badge
+    draw.ellipse([1400, 1550, 1650, 1800], fill='#F39C12')
+    return img
+
+
+def _mockup_3_text(draw, product):
+    header_font = get_font(55)
+    
+    # Title
+    title_text = product['name']
+    if len(title_text) > 25:
+        words = title_text.split()
+        line1 = ' '.join(words[:len(words)//2])
+        line2 = ' '.join(words[len(words)//2:])
+        draw.text((1000, 280), line1, fill='white', font=header_font, anchor='mm')
+        draw.text((1000, 370), line2, fill='white', font=header_font, anchor='mm')
+    else:
+        draw.text((1000, 325), title_text, fill='white', font=header_font, anchor='mm')
+    
+    # Features list
+    feature_font = get_font(40)
+    y_pos = 550
+    for idx, feature in enumerate(product['features'][:4]):
+        feature_text = feature if len(feature) < 40 else feature[:37] + '...'
+        draw.text((470, y_pos+10), feature_text, fill='#2C3E50', font=feature_font, anchor='lm')
+        y_pos += 150
+    
+    # Price
+    price_font = get_font(70)
+    draw.text((1525, 1675), f"${product['price']}", fill='white', font=price_font, anchor='mm')
+
+
+# Each mockup style is a static base layer plus a per-product text layer
+MOCKUP_STYLES = {
+    1: (_mockup_1_base, _mockup_1_text),
+    2: (_mockup_2_base, _mockup_2_text),
+    3: (_mockup_3_base, _mockup_3_text),
+}
+
+
+def _base_args(product, mockup_num):
+    """Arguments that select a style's base layer (only mockup 3 varies, by feature rows)"""
+    return (min(len(product['features']), 4),) if mockup_num == 3 else ()
+
+
+@lru_cache(maxsize=None)
+def mockup_base(mockup_num, *args):
+    """Static chrome for a mockup style, rendered once per run. Callers must copy()."""
+    _require_pil()
+    render_base, _ = MOCKUP_STYLES[mockup_num]
+    return render_base(*args)
+
+
+def render_mockup(product, mockup_num):
+    """Composite the cached base layer for a style with the product's text"""
+    _require_pil()
+    img = mockup_base(mockup_num, *_base_args(product, mockup_num)).copy()
+    _, draw_text = MOCKUP_STYLES[mockup_num]
+    draw_text(ImageDraw.Draw(img), product)
+    return img
+
+
+def create_mockup_image(product, mockup_num, encoder=DEFAULT_MOCKUP_ENCODER):
+    """Generate one of the three mockup styles for a product and return its path"""
+    img = render_mockup(product, mockup_num)
+    
+    # Save mockup
+    mockup_filename = mockup_path(product, mockup_num, encoder)
+    save_mockup(img, mockup_filename, encoder)
+    return mockup_filename
+
+
+def save_mockup(img, filename, encoder=DEFAULT_MOCKUP_ENCODER):
+    """Encode a rendered mockup with one of the MOCKUP_ENCODERS presets"""
+    image_format, _, options = MOCKUP_ENCODERS[encoder]
+    img.save(filename, image_format, dpi=(300, 300), **options)
 
 
 def create_mockup_images(product):
@@ -815,137 +1341,7 @@ def create_mockup_images(product):
     
     for mockup_num in range(1, 4):  # Create 3 mockups per product
         try:
-            # Create 2000x2000 image
-            img = Image.new('RGB', (2000, 2000), color='white')
-            draw = ImageDraw.Draw(img)
-            
-            if mockup_num == 1:
-                # Mockup 1: Clean product preview
-                # Add border
-                draw.rectangle([100, 100, 1900, 1900], outline='#E0E0E0', width=5)
-                
-                # Title area
-                draw.rectangle([100, 100, 1900, 400], fill='#3498DB')
-                
-                # Product name (use default font for simplicity)
-                try:
-                    font = ImageFont.truetype("arial.ttf", 60)
-                except:
-                    font = ImageFont.load_default()
-                
-                # Draw product name
-                text = product['name']
-                # Wrap text if too long
-                if len(text) > 30:
-                    words = text.split()
-                    line1 = ' '.join(words[:len(words)//2])
-                    line2 = ' '.join(words[len(words)//2:])
-                    draw.text((1000, 200), line1, fill='white', font=font, anchor='mm')
-                    draw.text((1000, 280), line2, fill='white', font=font, anchor='mm')
-                else:
-                    draw.text((1000, 250), text, fill='white', font=font, anchor='mm')
-                
-                # Content area - simulate template preview
-                y_pos = 500
-                for i in range(6):
-                    draw.rectangle([200, y_pos, 1800, y_pos + 80], outline='#BDC3C7', width=2)
-                    y_pos += 120
-                
-                # Footer
-                draw.rectangle([100, 1700, 1900, 1900], fill='#2C3E50')
-                try:
-                    footer_font = ImageFont.truetype("arial.ttf", 40)
-                except:
-                    footer_font = ImageFont.load_default()
-                draw.text((1000, 1800), 'INSTANT DOWNLOAD • PDF', fill='white', font=footer_font, anchor='mm')
-                
-            elif mockup_num == 2:
-                # Mockup 2: Lifestyle/desk scene
-                # Background gradient effect
-                for i in range(2000):
-                    color_val = int(240 - (i / 2000) * 40)
-                    draw.line([(0, i), (2000, i)], fill=(color_val, color_val, color_val))
-                
-                # Desk surface
-                draw.rectangle([0, 1200, 2000, 2000], fill='#D7CCC8')
-                
-                # Paper/template mockup
-                draw.rectangle([400, 600, 1600, 1700], fill='white', outline='#757575', width=3)
-                
-                # Template content
-                draw.rectangle([500, 700, 1500, 850], fill='#3498DB')
-                try:
-                    title_font = ImageFont.truetype("arial.ttf", 50)
-                except:
-                    title_font = ImageFont.load_default()
-                draw.text((1000, 775), product['name'][:25], fill='white', font=title_font, anchor='mm')
-                
-                # Lines representing content
-                for i in range(5):
-                    y = 950 + i * 100
-                    draw.line([(550, y), (1450, y)], fill='#BDBDBD', width=3)
-                
-                # Coffee cup decoration
-                draw.ellipse([1650, 1400, 1850, 1600], fill='#6D4C41', outline='#4E342E', width=3)
-                
-            elif mockup_num == 3:
-                # Mockup 3: Features highlighted
-                # Background
-                img_bg = Image.new('RGB', (2000, 2000), color='#ECF0F1')
-                draw = ImageDraw.Draw(img_bg)
-                img = img_bg
-                
-                # Main product card
-                draw.rectangle([300, 200, 1700, 1800], fill='white', outline='#95A5A6', width=5)
-                
-                # Header
-                draw.rectangle([300, 200, 1700, 450], fill='#E74C3C')
-                try:
-                    header_font = ImageFont.truetype("arial.ttf", 55)
-                except:
-                    header_font = ImageFont.load_default()
-                
-                # Title
-                title_text = product['name']
-                if len(title_text) > 25:
-                    words = title_text.split()
-                    line1 = ' '.join(words[:len(words)//2])
-                    line2 = ' '.join(words[len(words)//2:])
-                    draw.text((1000, 280), line1, fill='white', font=header_font, anchor='mm')
-                    draw.text((1000, 370), line2, fill='white', font=header_font, anchor='mm')
-                else:
-                    draw.text((1000, 325), title_text, fill='white', font=header_font, anchor='mm')
-                
-                # Features list
-                try:
-                    feature_font = ImageFont.truetype("arial.ttf", 40)
-                except:
-                    feature_font = ImageFont.load_default()
-                
-                y_pos = 550
-                for idx, feature in enumerate(product['features'][:4]):
-                    # Checkmark circle
-                    draw.ellipse([370, y_pos-15, 420, y_pos+35], fill='#27AE60')
-                    draw.text((395, y_pos+10), '✓', fill='white', font=feature_font, anchor='mm')
-                    
-                    # Feature text
-                    feature_text = feature if len(feature) < 40 else feature[:37] + '...'
-                    draw.text((470, y_pos+10), feature_text, fill='#2C3E50', font=feature_font, anchor='lm')
-                    y_pos += 150
-                
-                # Price badge
-                draw.ellipse([1400, 1550, 1650, 1800], fill='#F39C12')
-                try:
-                    price_font = ImageFont.truetype("arial.ttf", 70)
-                except:
-                    price_font = ImageFont.load_default()
-                draw.text((1525, 1675), f"${product['price']}", fill='white', font=price_font, anchor='mm')
-            
-            # Save mockup
-            mockup_filename = f"mockups/{product['filename'].replace('.pdf', '')}_mockup_{mockup_num}.png"
-            img.save(mockup_filename, 'PNG', dpi=(300, 300))
-            mockup_files.append(mockup_filename)
-            
+            mockup_files.append(create_mockup_image(product, mockup_num))
         except Exception as e:
             print(f"⚠️  Error creating mockup {mockup_num} for {product['name']}: {str(e)}")
             continue
@@ -953,27 +1349,181 @@ def create_mockup_images(product):
     return mockup_files
 
 
-# Generate mockups for all products
-mockup_count = 0
-for product in PRODUCTS:
+def _render_mockup_job(job):
+    """Render one mockup in a pool worker and ship back its raw pixels"""
+    product, mockup_num = job
+    start = time.perf_counter()
+    img = render_mockup(product, mockup_num)
+    return img.mode, img.size, img.tobytes(), time.perf_counter() - start
+
+
+def _write_mockup_job(job, render_future, slots, timings, encoder):
+    """I/O stage: wait for a render, then encode and write it to disk"""
+    product, mockup_num = job
     try:
-        mockups = create_mockup_images(product)
-        mockup_count += len(mockups)
-        print(f"✅ Mockups for: {product['name']} ({len(mockups)} images)")
+        _require_pil()
+        mode, size, data, render_seconds = render_future.result()
+        start = time.perf_counter()
+        save_mockup(Image.frombytes(mode, size, data), mockup_path(product, mockup_num, encoder), encoder)
+        timings.append((render_seconds, time.perf_counter() - start))
+        return True, None
     except Exception as e:
-        print(f"⚠️  Error creating mockups for {product['name']}: {str(e)}")
-        continue
-
-print(f"\n✅ All mockups generated! Total: {mockup_count} images")
-print(f"📦 Mockups saved in: {os.path.abspath('mockups')}")
-
-print("\n" + "="*60)
-print("✅ PHASE 1 & 2 COMPLETE!")
-print("="*60)
-print(f"\n📊 Summary:")
-print(f"   • Products created: {len(PRODUCTS)}")
-print(f"   • Mockup images: {mockup_count}")
-print(f"\n🌐 Ready for Phase 3: Etsy Setup & Listing")
-print(f"   Next: Run the Etsy automation script")
-print("="*60)
+        return False, str(e)
+    finally:
+        slots.release()
+
+
+def run_mockup_pipeline(jobs, workers, io_threads=2, max_memory_mb=MOCKUP_MEMORY_MB,
+                        encoder=DEFAULT_MOCKUP_ENCODER):
+    """Render (product, mockup_num) jobs in a process pool and encode/write them in threads
+
+    At most `max_memory_mb` worth of decoded mockups is in flight between the
+    two stages; submitting more blocks until a write finishes. Returns a list
+    of (ok, error) in job order plus the (render, encode) seconds per image.
+    """
+    max_inflight = max(1, (max_memory_mb * 1024 * 1024) // MOCKUP_INFLIGHT_BYTES)
+    slots = threading.BoundedSemaphore(max_inflight)
+    timings = []
+    writes = []
+
+    with ProcessPoolExecutor(max_workers=workers) as render_pool, \
+            ThreadPoolExecutor(max_workers=io_threads) as io_pool:
+        for job in jobs:
+            slots.acquire()
+            render_future = render_pool.submit(_render_mockup_job, job)
+            writes.append(io_pool.submit(_write_mockup_job, job, render_future, slots, timings, encoder))
+        outcomes = [write.result() for write in writes]
+
+    return outcomes, timings
+
+
+def _create_mockup_outcome(product, mockup_num, encoder):
+    try:
+        create_mockup_image(product, mockup_num, encoder)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def build_mockups(manifest=None, force=False, jobs=1, io_threads=2, max_memory_mb=MOCKUP_MEMORY_MB,
+                  encoder=DEFAULT_MOCKUP_ENCODER):
+    """Generate mockups for all products
+
+    With a manifest, each mockup is only re-rendered when the product fields
+    it shows (see MOCKUP_FIELDS) or the renderer changed, unless `force` is set.
+    With jobs > 1 mockups go through run_mockup_pipeline().
+    """
+    start = time.perf_counter()
+    pending = []
+    skipped = 0
+    for product in PRODUCTS:
+        for mockup_num in range(1, 4):  # Create 3 mockups per product
+            output = mockup_path(product, mockup_num, encoder)
+            digest = mockup_input_digest(product, mockup_num, encoder) if manifest is not None else None
+            if manifest is not None and not force and is_up_to_date(manifest, output, digest):
+                skipped += 1
+                continue
+            pending.append((product, mockup_num, digest))
+
+    timings = []
+    if jobs > 1 and len(pending) > 1:
+        outcomes, timings = run_mockup_pipeline(
+            [(product, mockup_num) for product, mockup_num, _ in pending],
+            jobs, io_threads, max_memory_mb, encoder,
+        )
+    else:
+        outcomes = [_create_mockup_outcome(product, mockup_num, encoder)
+                    for product, mockup_num, _ in pending]
+
+    mockup_count = 0
+    per_product = {}
+    for (product, mockup_num, digest), (ok, error) in zip(pending, outcomes):
+        if not ok:
+            print(f"⚠️  Error creating mockup {mockup_num} for {product['name']}: {error}")
+            continue
+        mockup_count += 1
+        per_product[product['id']] = per_product.get(product['id'], 0) + 1
+        if manifest is not None:
+            record_build(manifest, mockup_path(product, mockup_num, encoder), digest, 'create_mockup_image')
+
+    for product in PRODUCTS:
+        if product['id'] in per_product:
+            print(f"✅ Mockups for: {product['name']} ({per_product[product['id']]} images)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ All mockups generated! Total: {mockup_count} images")
+    if mockup_count:
+        print(f"⚡ Throughput: {mockup_count / elapsed:.1f} images/sec "
+              f"({elapsed:.2f}s, {jobs} job{'s' if jobs > 1 else ''})")
+    if timings:
+        print(f"   Render {sum(t[0] for t in timings):.2f}s in workers, "
+              f"encode + write {sum(t[1] for t in timings):.2f}s in {io_threads} I/O threads")
+    if skipped:
+        print(f"⏭️  {skipped} unchanged mockups skipped")
+    print(f"📦 Mockups saved in: {os.path.abspath('mockups')}")
+    return mockup_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build Etsy product PDFs and mockups")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="worker processes for PDF and mockup builds (0 = one per CPU, default: 1)"
+    )
+    parser.add_argument(
+        "--pdf-forms", action="store_true",
+        help="draw repeated tracking pages once as PDF form XObjects (smaller, faster PDFs)"
+    )
+    parser.add_argument(
+        "--mockup-encoder", choices=sorted(MOCKUP_ENCODERS), default=DEFAULT_MOCKUP_ENCODER,
+        help=f"mockup output format/compression preset (default: {DEFAULT_MOCKUP_ENCODER})"
+    )
+    parser.add_argument(
+        "--io-threads", type=int, default=2,
+        help="threads encoding and writing mockups when --jobs > 1 (default: 2)"
+    )
+    parser.add_argument(
+        "--max-memory", type=int, default=MOCKUP_MEMORY_MB, metavar="MB",
+        help=f"cap on mockup pixels in flight between render and encode (default: {MOCKUP_MEMORY_MB})"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="rebuild every PDF and mockup, ignoring the build manifest"
+    )
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # Create directories
+    os.makedirs("products", exist_ok=True)
+    os.makedirs("mockups", exist_ok=True)
+
+    print("🚀 Starting Etsy Shop Automation...")
+    print("\n" + "="*60)
+    print("📁 PHASE 1: CREATING PRODUCTS")
+    print("="*60 + "\n")
+
+    manifest = load_manifest()
+    results = build_products(jobs, manifest, args.force, args.pdf_forms)
+    save_manifest(manifest)
+
+    print("\n" + "="*60)
+    print("🖼️  PHASE 2: GENERATING MOCKUPS")
+    print("="*60 + "\n")
+
+    mockup_count = build_mockups(manifest, args.force, jobs, args.io_threads, args.max_memory,
+                                 args.mockup_encoder)
+    save_manifest(manifest)
+
+    print("\n" + "="*60)
+    print("✅ PHASE 1 & 2 COMPLETE!")
+    print("="*60)
+    print(f"\n📊 Summary:")
+    print(f"   • Products created: {sum(1 for r in results if r[1])}")
+    print(f"   • Mockup images: {mockup_count}")
+    print(f"\n🌐 Ready for Phase 3: Etsy Setup & Listing")
+    print(f"   Next: Run the Etsy automation script")
+    print("="*60)
+
 
+if __name__ == "__main__":
+    main()